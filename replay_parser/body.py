@@ -1,12 +1,26 @@
 import struct
-from typing import Any, Dict, Iterator, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 from replay_parser.exception import InvalidReplay
-from replay_parser.commands import COMMAND_PARSERS
+from replay_parser.frames import FIXED_FRAME_LENGTHS, FRAME_HEAD, find_next_frame, is_valid_frame
+from replay_parser.commands import COMMAND_PARSERS, COMMAND_PEEKERS
 from replay_parser.constants import CommandStateNames, CommandStates
+from replay_parser.messages import MESSAGE_CALLBACK, chat_message
+from replay_parser.metrics import ParserMetrics
 from replay_parser.reader import ACCEPTABLE_DATA_TYPE, ReplayReader
+from replay_parser.storage import SpillingBodyStorage
 
-__all__ = ('ReplayBody',)
+__all__ = ('ReplayBody', 'TYPE_COMMAND_HANDLER', 'TYPE_COMMAND_FILTER')
+
+TYPE_COMMAND_HANDLER = Callable[[int, int, Any], Any]
+TYPE_COMMAND_FILTER = Callable[[Dict[str, Any]], bool]
+
+# commands, that must be parsed to know tick and player of any other command
+STATE_COMMANDS = frozenset((CommandStates.Advance, CommandStates.SetCommandSource))
+# commands parsed before `start_tick`
+SKIP_TICKS_COMMANDS = STATE_COMMANDS | {CommandStates.CommandSourceTerminated}
+# commands kept, when handlers restrict parsing, so desyncs and chat messages are still found
+RESULT_COMMANDS = STATE_COMMANDS | {CommandStates.VerifyChecksum, CommandStates.LuaSimCallback}
 
 
 class ReplayBody:
@@ -19,6 +33,13 @@ class ReplayBody:
             stop_on_desync: bool = False,
             parse_commands: set = None,
             store_body: bool = False,
+            metrics: ParserMetrics = None,
+            handlers: Dict[int, TYPE_COMMAND_HANDLER] = None,
+            start_tick: int = 0,
+            end_tick: Optional[int] = None,
+            body_storage: SpillingBodyStorage = None,
+            recover: bool = False,
+            command_filters: Dict[int, TYPE_COMMAND_FILTER] = None,
             **kwargs
     ) -> None:
         """
@@ -29,14 +50,61 @@ class ReplayBody:
             Important: you can't detect desyncs, if you won't have CommandStates.VerifyChecksum
         :param bool store_body: stores every next tick data of replay to content to self.body.
             To get list of commands use get_body
+        :param ParserMetrics metrics: collects counters and timings of commands, disabled by default
+        :param dict handlers: command id to callable, see `register_handler`
+        :param int start_tick: commands before this tick are skipped, only `Advance`, `SetCommandSource`
+            and `CommandSourceTerminated` are parsed there. Desyncs before start_tick are not detected.
+        :param int end_tick: stops parsing before `Advance`, that would move tick after end_tick.
+            Game runs 10 ticks per second.
+        :param SpillingBodyStorage body_storage: stores body with bounded memory instead of list,
+            implies store_body. Storage is emptied by `reset`, body has to be read before next parsing.
+        :param bool recover: skips invalid commands and continues from next valid frame,
+            offsets of skipped commands are in `get_corrupted_offsets`. Raises `InvalidReplay` otherwise.
+            Needs seekable data, streams read through `StreamBuffer` raise `TypeError`.
+        :param dict command_filters: command id to predicate, see `register_filter`
         """
         self.replay_reader: ReplayReader = reader
         self.command_reader: ReplayReader = ReplayReader()
+        self.body_storage: Optional[SpillingBodyStorage] = body_storage
+        self.reset()
+
+        self.stop_on_desync = bool(stop_on_desync)
+        self.recover = bool(recover)
+        self.parse_commands = set(parse_commands or set())
+        self.store_body = bool(store_body or body_storage is not None)
+        self.metrics: Optional[ParserMetrics] = metrics
 
-        self.body: List = []
+        self.start_tick = int(start_tick or 0)
+        self.end_tick = end_tick
+        if self.parse_commands and (self.start_tick or self.end_tick is not None):
+            self.parse_commands.add(CommandStates.Advance)
+
+        # only chat callbacks are parsed from `LuaSimCallback`, handlers added it for messages
+        self.chat_callbacks_only = False
+        self.handlers: Dict[int, TYPE_COMMAND_HANDLER] = {}
+        for command_type, handler in (handlers or {}).items():
+            self.register_handler(command_type, handler)
+
+        self.command_filters: Dict[int, TYPE_COMMAND_FILTER] = {}
+        for command_type, predicate in (command_filters or {}).items():
+            self.register_filter(command_type, predicate)
+
+    def reset(self) -> None:
+        """
+        Clears parsing state, so next replay can be parsed with same options and readers.
+        Results of previous parsing aren't modified, except of body kept in `body_storage`:
+        storage is emptied and reused, so body returned by previous parsing is invalidated.
+        """
+        if self.body_storage is None:
+            self.body: Union[List, SpillingBodyStorage] = []
+        else:
+            self.body_storage.close()
+            self.body = self.body_storage
         self.last_players_tick: Dict = {}
         self.desync_ticks: List = []
         self.messages: Dict = {}
+        self.corrupted_offsets: List[int] = []
+        self.command_reader.selections.clear()
 
         self.tick: int = 0
         self.tick_data: Dict = {}
@@ -44,12 +112,53 @@ class ReplayBody:
 
         self.previous_tick = -1
         self.previous_checksum = None
+        self.stopped = False
 
-        self.stop_on_desync = bool(stop_on_desync)
-        self.parse_commands = set(parse_commands or set())
-        self.store_body = bool(store_body)
+    def register_handler(self, command_type: int, handler: TYPE_COMMAND_HANDLER) -> None:
+        """
+        Registers callable, that is called with `tick, player_id, command_data` for every parsed
+        command of given type.
+
+        Only commands with handler (and `Advance`, `SetCommandSource` for tick and player tracking)
+        are parsed from now on, other ones are skipped without decoding.
+        Commands from `parse_commands` are still parsed too. When `parse_commands` wasn't set,
+        `VerifyChecksum` and chat messages are parsed too, so desyncs and messages are still found.
+        """
+        if command_type not in COMMAND_PARSERS:
+            raise ValueError("Unknown command type {}".format(command_type))
+
+        self.handlers[command_type] = handler
+        if not self.parse_commands:
+            self.parse_commands.update(RESULT_COMMANDS)
+            self.chat_callbacks_only = True
+        self.parse_commands.update(STATE_COMMANDS)
+        self.parse_commands.add(command_type)
+        if command_type == CommandStates.LuaSimCallback:
+            self.chat_callbacks_only = False
+
+    def register_filter(self, command_type: int, predicate: TYPE_COMMAND_FILTER) -> None:
+        """
+        Registers predicate, that is called with minimal fields of command from
+        `replay_parser.commands.COMMAND_PEEKERS`, before command is parsed.
+        Commands, for which predicate returns false, are skipped without decoding, as if they
+        weren't in `parse_commands`.
+        ::
+            >>> body.register_filter(
+            >>>     CommandStates.IssueCommand,
+            >>>     lambda fields: fields["command_type"] in (ActionType.Nuke, ActionType.Teleport)
+            >>> )
+
+        Filter doesn't change `parse_commands`, other commands are parsed same as without it.
+        """
+        if command_type not in COMMAND_PEEKERS:
+            raise ValueError("Command type {} can't be filtered".format(command_type))
+
+        self.command_filters[command_type] = predicate
 
-    def get_body(self) -> List:
+    def get_body(self) -> Union[List, SpillingBodyStorage]:
+        """
+        Returns list of tick data, or `body_storage`, that reads them lazily while iterating
+        """
         return self.body
 
     def get_messages(self) -> Dict:
@@ -61,6 +170,9 @@ class ReplayBody:
     def get_desync_ticks(self) -> List:
         return self.desync_ticks
 
+    def get_corrupted_offsets(self) -> List[int]:
+        return self.corrupted_offsets
+
     def parse(self) -> None:
         """
         Parses all replay data
@@ -80,12 +192,48 @@ class ReplayBody:
         """
         if data:
             self.replay_reader.set_data(data)
-
-        buffer_size = self.replay_reader.size()
-        while self.replay_reader.offset() + 3 <= buffer_size:
-            command_type, command_data = self.parse_command_and_get_data()
+        if self.recover and self.replay_reader.size() is None:
+            raise TypeError("Replay stream can't be recovered, use bytes or seekable buffer with recover")
+
+        has_more = self.replay_reader.has_more
+        while not self.stopped and has_more(3):
+            command_offset = self.replay_reader.offset()
+            try:
+                command_type, command_data = self.parse_command_and_get_data()
+            except InvalidReplay:
+                if not self.recover:
+                    raise
+                self.corrupted_offsets.append(command_offset)
+                next_offset = self.find_recovery_offset(command_offset)
+                if next_offset is None:
+                    break
+                self.replay_reader.seek(next_offset)
+                continue
+
+            if self.stopped:
+                break
             yield self.tick, command_type, command_data
 
+        if not self.stopped and has_more():
+            if not self.recover:
+                raise InvalidReplay("Truncated command at offset {}".format(self.replay_reader.offset()))
+            self.corrupted_offsets.append(self.replay_reader.offset())
+
+        if self.metrics is not None:
+            self.metrics.flush()
+
+    def find_recovery_offset(self, command_offset: int) -> Optional[int]:
+        """
+        Returns offset of next valid command after invalid one.
+        Command with valid framing, that can't be decoded, is skipped by its length.
+        """
+        data = self.replay_reader.get_data()
+        if is_valid_frame(data, command_offset):
+            frame_end = command_offset + FRAME_HEAD.unpack_from(data, command_offset)[1]
+            if frame_end == len(data) or find_next_frame(data, frame_end, lookahead=1) == frame_end:
+                return frame_end
+        return find_next_frame(data, command_offset + 1)
+
     def parse_command_and_get_data(self) -> Tuple[Optional[int], Optional[bytes]]:
         """
         Parses one command and returns its type and binary data for whole command
@@ -110,10 +258,25 @@ class ReplayBody:
 
         command_type = struct.unpack("B", command_type_byte)[0]
         command_length = struct.unpack("<H", command_length_byte)[0]
+        if (
+                command_type not in COMMAND_PARSERS
+                or command_length < 3
+                or FIXED_FRAME_LENGTHS.get(command_type, command_length) != command_length
+        ):
+            raise InvalidReplay("Invalid command {} with length {} at offset {}".format(
+                command_type, command_length, self.replay_reader.offset() - 3
+            ))
 
         data = self.replay_reader.read(command_length - 3)
+        if len(data) != command_length - 3:
+            raise InvalidReplay("Truncated command {} at offset {}".format(
+                command_type, self.replay_reader.offset() - len(data) - 3
+            ))
+
+        if self.metrics is not None:
+            self.metrics.count_command(command_type, command_length)
 
-        if self.can_parse_next_command(command_type):
+        if self.can_parse_next_command(command_type) and self.passes_filter(command_type, data):
             self.parse_next_command(command_type, data)
 
         return command_type, command_type_byte + command_length_byte + data
@@ -128,9 +291,41 @@ class ReplayBody:
         except Exception as e:
             raise InvalidReplay(e)
 
-        command_data = command_parser(self.command_reader)
+        try:
+            if self.metrics is None:
+                command_data = command_parser(self.command_reader)
+            else:
+                command_data = self.metrics.measure(command_type, command_parser, self.command_reader)
+        except (struct.error, ValueError, TypeError, IndexError, KeyError) as e:
+            raise InvalidReplay("Can't parse command {}: {}".format(CommandStateNames[command_type], e)) from e
         self.process_command(command_type, command_data)
 
+        handler = self.handlers.get(command_type)
+        if handler is not None and not self.stopped:
+            handler(self.tick, self.player_id, command_data)
+
+    def passes_filter(self, command_type: int, data: bytes) -> bool:
+        """
+        Checks command by filter predicate, reading only fields needed for it
+        """
+        if (
+                command_type == CommandStates.LuaSimCallback
+                and self.chat_callbacks_only
+                and not data.startswith(MESSAGE_CALLBACK)
+        ):
+            return False
+
+        predicate = self.command_filters.get(command_type)
+        if predicate is None:
+            return True
+
+        self.command_reader.set_data_from_bytes(data)
+        try:
+            fields = COMMAND_PEEKERS[command_type](self.command_reader)
+        except (struct.error, ValueError) as e:
+            raise InvalidReplay("Can't parse command {}: {}".format(CommandStateNames[command_type], e)) from e
+        return predicate(fields)
+
     def process_command(self, command_type: int, command_data: Any) -> None:
         """
         Defines operations over some of commands, handles tick counter,
@@ -142,6 +337,9 @@ class ReplayBody:
             if self.store_body and self.tick_data:
                 self.body.append(self.tick_data)
             self.tick_data = {}
+            if self.end_tick is not None and self.tick + command_data["advance"] > self.end_tick:
+                self.stopped = True
+                return
             self.tick += command_data["advance"]
 
         elif command_type == CommandStates.SetCommandSource:
@@ -154,22 +352,29 @@ class ReplayBody:
             checksum, tick = command_data["checksum"], command_data["tick"]
             if tick == self.previous_tick and checksum != self.previous_checksum:
                 if self.stop_on_desync:
-                    raise StopIteration()
+                    self.stopped = True
+                    return
 
                 self.desync_ticks.append(self.tick)
             self.previous_tick = tick
             self.previous_checksum = checksum
 
         elif command_type == CommandStates.LuaSimCallback:
-            cmd_string, data = command_data["lua_name"], command_data["lua"]
-            if cmd_string == "GiveResourcesToPlayer" and "Msg" in data:
-                self.messages[self.tick] = (data["Sender"], data["Msg"]["to"], data["Msg"]["text"])
-
-        if self.store_body:
+            if command_data["lua_name"] == "GiveResourcesToPlayer":
+                try:
+                    message = chat_message(command_data["lua"])
+                except ValueError as e:
+                    raise InvalidReplay("Can't parse chat message at tick {}: {}".format(self.tick, e)) from e
+                if message is not None:
+                    self.messages[self.tick] = message
+
+        if self.store_body and self.tick >= self.start_tick:
             self.tick_data.setdefault(self.player_id, {})[command_name] = command_data
 
     def can_parse_next_command(self, command_type: int):
         """
         Runs per command
         """
+        if self.tick < self.start_tick and command_type not in SKIP_TICKS_COMMANDS:
+            return False
         return not self.parse_commands or command_type in self.parse_commands
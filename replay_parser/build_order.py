@@ -0,0 +1,69 @@
+from typing import Dict, List, Optional, Tuple
+
+from replay_parser.body import ReplayBody
+from replay_parser.constants import ActionType, CommandStates
+from replay_parser.header import ReplayHeader
+from replay_parser.reader import ACCEPTABLE_DATA_TYPE, ReplayReader
+
+__all__ = ('BUILD_ACTIONS', 'extract_build_order')
+
+TYPE_BUILD_ORDER = Dict[int, List[Tuple[int, str, int]]]
+
+BUILD_ACTIONS = frozenset((ActionType.BuildMobile, ActionType.BuildFactory))
+BUILD_COMMANDS = frozenset((CommandStates.IssueCommand, CommandStates.IssueFactoryCommand))
+
+OBSERVER_SOURCE = 255
+
+
+def extract_build_order(
+        input_data: ACCEPTABLE_DATA_TYPE,
+        limit: Optional[int] = None,
+        end_tick: Optional[int] = None,
+) -> TYPE_BUILD_ORDER:
+    """
+    Returns what every player built and when, as player id to list of `(tick, blueprint_id, action_type)`.
+    Player ids are keys of header `armies`.
+
+    Only `IssueCommand` and `IssueFactoryCommand` with build action are decoded, other orders are
+    skipped by command filter. Parsing stops, when every player has `limit` entries or when `end_tick`
+    is reached.
+
+    :param input_data: data source
+    :param int limit: number of entries per player
+    :param int end_tick: last tick of build order
+    """
+    reader = ReplayReader(input_data)
+    header = ReplayHeader(reader)
+
+    build_order: TYPE_BUILD_ORDER = {
+        player_id: [] for player_id in header.armies if player_id != OBSERVER_SOURCE
+    }
+    unfinished = set(build_order) if limit is not None else None
+
+    def add_build(tick: int, player_id: int, command: Dict) -> None:
+        cmd_data = command["cmd_data"]
+        player_builds = build_order.setdefault(player_id, [])
+        if unfinished is None:
+            player_builds.append((tick, cmd_data["blueprint_id"], cmd_data["command_type"]))
+            return
+
+        if len(player_builds) < limit:
+            player_builds.append((tick, cmd_data["blueprint_id"], cmd_data["command_type"]))
+        if len(player_builds) >= limit:
+            unfinished.discard(player_id)
+            if not unfinished:
+                body.stopped = True
+
+    def is_build(fields: Dict) -> bool:
+        return fields["command_type"] in BUILD_ACTIONS
+
+    body = ReplayBody(
+        reader,
+        end_tick=end_tick,
+        parse_commands=BUILD_COMMANDS,
+        handlers={command_type: add_build for command_type in BUILD_COMMANDS},
+        command_filters={command_type: is_build for command_type in BUILD_COMMANDS},
+    )
+    if unfinished is None or unfinished:
+        body.parse()
+    return build_order
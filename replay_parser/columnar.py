@@ -0,0 +1,221 @@
+import os
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from replay_parser.body import ReplayBody
+from replay_parser.constants import CommandStates
+from replay_parser.export import ReplayJSONEncoder
+from replay_parser.header import ReplayHeader
+from replay_parser.reader import ACCEPTABLE_DATA_TYPE, ReplayReader
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+__all__ = ('COMMAND_FAMILIES', 'iter_record_batches', 'write_parquet')
+
+# family name to commands, that are written to family table
+COMMAND_FAMILIES = {
+    "issue": (CommandStates.IssueCommand, CommandStates.IssueFactoryCommand),
+    "create_unit": (CommandStates.CreateUnit,),
+    "checksum": (CommandStates.VerifyChecksum,),
+    "lua_sim_callback": (CommandStates.LuaSimCallback,),
+}
+
+
+def _require_pyarrow() -> None:
+    if pyarrow is None:
+        raise ImportError("pyarrow is required for columnar export, install replay_parser[arrow]")
+
+
+def _family_schemas() -> Dict[str, "pyarrow.Schema"]:
+    """
+    Columns follow field names from `COMMAND_PARSERS`, nested fields are flattened.
+    """
+    pa = pyarrow
+    names = pa.dictionary(pa.int32(), pa.string())
+    common = [("tick", pa.uint32()), ("player_id", pa.int16())]
+    return {
+        "issue": pa.schema(common + [
+            ("type", names),
+            ("unit_ids", pa.list_(pa.uint32())),
+            ("command_id", pa.int32()),
+            ("command_type", pa.uint8()),
+            ("target", pa.uint8()),
+            ("entity_id", pa.int32()),
+            ("x", pa.float32()),
+            ("y", pa.float32()),
+            ("z", pa.float32()),
+            ("blueprint_id", names),
+        ]),
+        "create_unit": pa.schema(common + [
+            ("army_index", pa.uint8()),
+            ("blueprint_id", names),
+            ("x", pa.float32()),
+            ("y", pa.float32()),
+            ("heading", pa.float32()),
+        ]),
+        "checksum": pa.schema(common + [
+            ("checksum", pa.string()),
+            ("checksum_tick", pa.uint32()),
+        ]),
+        "lua_sim_callback": pa.schema(common + [
+            ("lua_name", names),
+            ("lua", pa.string()),
+            ("size", pa.int32()),
+            ("data", pa.binary()),
+        ]),
+    }
+
+
+class _FamilyBuffer:
+    """
+    Collects rows of one family as python lists, until they're converted to record batch.
+    """
+
+    __slots__ = ("schema", "columns")
+
+    def __init__(self, schema: "pyarrow.Schema") -> None:
+        self.schema = schema
+        self.columns: Dict[str, List] = {name: [] for name in schema.names}
+
+    def __len__(self) -> int:
+        return len(self.columns["tick"])
+
+    def to_batch(self) -> "pyarrow.RecordBatch":
+        batch = pyarrow.RecordBatch.from_arrays(
+            [pyarrow.array(self.columns[field.name], type=field.type) for field in self.schema],
+            schema=self.schema,
+        )
+        for column in self.columns.values():
+            column.clear()
+        return batch
+
+
+def _family_handlers(buffers: Dict[str, _FamilyBuffer]) -> Dict[int, Callable]:
+    encode_lua = ReplayJSONEncoder(bytes_encoding="hex").encode
+    issue, create_unit = buffers["issue"].columns, buffers["create_unit"].columns
+    checksum, callback = buffers["checksum"].columns, buffers["lua_sim_callback"].columns
+
+    def add_issue(tick: int, player_id: int, command: Dict[str, Any]) -> None:
+        cmd_data = command["cmd_data"]
+        target = cmd_data["target"]
+        x, y, z = target["position"] or (None, None, None)
+        issue["tick"].append(tick)
+        issue["player_id"].append(player_id)
+        issue["type"].append(command["type"])
+        issue["unit_ids"].append(command["entity_ids_set"]["unit_ids"])
+        issue["command_id"].append(cmd_data["command_id"])
+        issue["command_type"].append(cmd_data["command_type"])
+        issue["target"].append(target["target"])
+        issue["entity_id"].append(target["entity_id"])
+        issue["x"].append(x)
+        issue["y"].append(y)
+        issue["z"].append(z)
+        issue["blueprint_id"].append(cmd_data["blueprint_id"] or None)
+
+    def add_create_unit(tick: int, player_id: int, command: Dict[str, Any]) -> None:
+        x, y, heading = command["vector"]
+        create_unit["tick"].append(tick)
+        create_unit["player_id"].append(player_id)
+        create_unit["army_index"].append(command["army_index"])
+        create_unit["blueprint_id"].append(command["blueprint_id"])
+        create_unit["x"].append(x)
+        create_unit["y"].append(y)
+        create_unit["heading"].append(heading)
+
+    def add_checksum(tick: int, player_id: int, command: Dict[str, Any]) -> None:
+        checksum["tick"].append(tick)
+        checksum["player_id"].append(player_id)
+        checksum["checksum"].append(command["checksum"])
+        checksum["checksum_tick"].append(command["tick"])
+
+    def add_callback(tick: int, player_id: int, command: Dict[str, Any]) -> None:
+        callback["tick"].append(tick)
+        callback["player_id"].append(player_id)
+        callback["lua_name"].append(command["lua_name"])
+        callback["lua"].append(encode_lua(command["lua"]))
+        callback["size"].append(command["size"])
+        callback["data"].append(command["data"])
+
+    return {
+        CommandStates.IssueCommand: add_issue,
+        CommandStates.IssueFactoryCommand: add_issue,
+        CommandStates.CreateUnit: add_create_unit,
+        CommandStates.VerifyChecksum: add_checksum,
+        CommandStates.LuaSimCallback: add_callback,
+    }
+
+
+def iter_record_batches(
+        input_data: ACCEPTABLE_DATA_TYPE,
+        batch_size: int = 65536,
+        **kwargs
+) -> Iterator[Tuple[str, "pyarrow.RecordBatch"]]:
+    """
+    Parses replay body and yields family name and arrow record batch, when family has `batch_size` rows.
+    Remaining rows are yielded at the end. Families are listed in `COMMAND_FAMILIES`.
+
+    :param input_data: data source
+    :param int batch_size: maximum rows in one batch
+    """
+    _require_pyarrow()
+    reader = ReplayReader(input_data, **kwargs)
+    ReplayHeader(reader)
+
+    buffers = {name: _FamilyBuffer(schema) for name, schema in _family_schemas().items()}
+    kwargs.pop("store_body", None)
+    body = ReplayBody(reader, handlers=_family_handlers(buffers), **kwargs)
+    family_by_command = {
+        command_type: (name, buffers[name])
+        for name, command_types in COMMAND_FAMILIES.items()
+        for command_type in command_types
+    }
+
+    for _, command_type, _ in body.continuous_parse():
+        family = family_by_command.get(command_type)
+        if family is not None and len(family[1]) >= batch_size:
+            yield family[0], family[1].to_batch()
+
+    for name, buffer in buffers.items():
+        if len(buffer):
+            yield name, buffer.to_batch()
+
+
+def write_parquet(
+        input_data: ACCEPTABLE_DATA_TYPE,
+        root_path: str,
+        replay_id: Any,
+        batch_size: int = 65536,
+        **kwargs
+) -> Dict[str, int]:
+    """
+    Writes command families to parquet files, partitioned by replay id:
+    `<root_path>/<family>/replay_id=<replay_id>/commands.parquet`.
+    Batches are written as soon as they are full.
+
+    :param input_data: data source
+    :param str root_path: dataset directory
+    :param replay_id: value of partition column
+    :param int batch_size: maximum rows in one row group
+    :return: number of written rows per family
+    """
+    _require_pyarrow()
+    writers = {}
+    rows = dict.fromkeys(COMMAND_FAMILIES, 0)
+    try:
+        for name, batch in iter_record_batches(input_data, batch_size, **kwargs):
+            writer = writers.get(name)
+            if writer is None:
+                directory = os.path.join(root_path, name, "replay_id={}".format(replay_id))
+                os.makedirs(directory, exist_ok=True)
+                writer = writers[name] = pyarrow.parquet.ParquetWriter(
+                    os.path.join(directory, "commands.parquet"), batch.schema
+                )
+            writer.write_batch(batch)
+            rows[name] += batch.num_rows
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return rows
@@ -1,16 +1,19 @@
+from io import SEEK_CUR
+from struct import unpack
 from typing import Tuple, Optional, List, Dict, Union
 
 from replay_parser.constants import TargetType, CommandStates
 from replay_parser.reader import ReplayReader, TYPE_LUA
+from replay_parser.units import blueprints
 
-__all__ = ('COMMAND_PARSERS',)
+__all__ = ('COMMAND_PARSERS', 'COMMAND_PEEKERS')
 
 
 TYPE_VECTOR = Tuple[float, float, float]
 TYPE_FORMATION = Optional[Dict[str, Union[float, TYPE_VECTOR]]]
 TYPE_TARGET = Dict[str, Union[int, TYPE_VECTOR]]
 TYPE_COMMAND_DATA = Dict[str, Union[int, bytes, TYPE_TARGET, TYPE_FORMATION]]
-TYPE_ENTITY_IDS_SET = Dict[str, Union[int, List[int]]]
+TYPE_ENTITY_IDS_SET = Dict[str, Union[int, Tuple[int, ...]]]
 
 
 def _read_vector(reader: ReplayReader) -> TYPE_VECTOR:
@@ -52,7 +55,7 @@ def command_single_step(reader: ReplayReader) -> Dict:
 
 def command_create_unit(reader: ReplayReader) -> Dict[str, Union[int, str, TYPE_VECTOR]]:
     army_index = reader.read_byte()
-    blueprint_id = reader.read_string()
+    blueprint_id = blueprints.intern(reader.read_string())
     x, y, heading = _read_vector(reader)
     return {"type": "create_unit",
             "army_index": army_index,
@@ -88,10 +91,14 @@ def command_process_info_pair(reader: ReplayReader) -> Dict[str, Union[int, str]
 
 
 def _parse_entity_ids_set(reader: ReplayReader) -> TYPE_ENTITY_IDS_SET:
+    """
+    Same selections are decoded once per replay, commands share tuple of unit ids.
+    """
     units_number = reader.read_uint()
-    unit_ids = []
-    for i in range(units_number):
-        unit_ids.append(reader.read_uint())
+    raw_ids = reader.read(4 * units_number)
+    unit_ids = reader.selections.get(raw_ids)
+    if unit_ids is None:
+        unit_ids = reader.selections[raw_ids] = unpack("<%dI" % units_number, raw_ids)
     return {"units_number": units_number, "unit_ids": unit_ids}
 
 
@@ -127,7 +134,7 @@ def _parse_command_data(reader: ReplayReader) -> TYPE_COMMAND_DATA:
     arg3 = reader.read(1)
     formation = _parse_formation(reader)
 
-    blueprint_id = reader.read_string()
+    blueprint_id = blueprints.intern(reader.read_string())
 
     arg4 = reader.read(12)
     arg5 = None
@@ -273,3 +280,41 @@ COMMAND_PARSERS = {
     CommandStates.LuaSimCallback: command_lua_sim_callback,
     CommandStates.EndGame: command_end_game,
 }
+
+
+def peek_issue(reader: ReplayReader) -> Dict[str, Union[int, str]]:
+    """
+    Reads fields of `IssueCommand` and `IssueFactoryCommand` for filters, unit ids, cells and
+    unknown args are skipped.
+    """
+    units_number = reader.read_uint()
+    reader.seek(4 * units_number, SEEK_CUR)
+    command_id = reader.read_int()
+    reader.seek(4, SEEK_CUR)
+    command_type = reader.read_byte()
+    reader.seek(4, SEEK_CUR)
+    _parse_target(reader)
+    reader.seek(1, SEEK_CUR)
+    _parse_formation(reader)
+    return {"units_number": units_number,
+            "command_id": command_id,
+            "command_type": command_type,
+            "blueprint_id": blueprints.intern(reader.read_string())}
+
+
+def peek_create_unit(reader: ReplayReader) -> Dict[str, Union[int, str]]:
+    return {"army_index": reader.read_byte(),
+            "blueprint_id": blueprints.intern(reader.read_string())}
+
+
+def peek_lua_sim_callback(reader: ReplayReader) -> Dict[str, str]:
+    return {"lua_name": reader.read_string()}
+
+
+# minimal fields of commands, that can be checked before whole command is parsed
+COMMAND_PEEKERS = {
+    CommandStates.CreateUnit: peek_create_unit,
+    CommandStates.IssueCommand: peek_issue,
+    CommandStates.IssueFactoryCommand: peek_issue,
+    CommandStates.LuaSimCallback: peek_lua_sim_callback,
+}
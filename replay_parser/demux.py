@@ -0,0 +1,74 @@
+from array import array
+from typing import Any, Container, Dict, Iterator, List, Optional, Tuple
+
+from replay_parser.commands import COMMAND_PARSERS
+from replay_parser.constants import CommandStates
+from replay_parser.frames import FRAME_HEAD, FRAME_HEAD_SIZE, iter_tick_frames
+from replay_parser.header import ReplayHeader
+from replay_parser.reader import SEEKABLE_DATA_TYPE, ReplayReader
+
+__all__ = ('PlayerStreamIndex',)
+
+
+class PlayerStreamIndex:
+    """
+    Index of command frames of every player, built by one pass over frames without decoding commands.
+    `Advance` and `SetCommandSource` frames aren't indexed, every other frame belongs to active player.
+    ::
+        >>> index = PlayerStreamIndex(data)
+        >>> for tick, command_type, command_data in index.iter_commands(3, {CommandStates.IssueCommand}):
+        >>>     pass
+    """
+
+    def __init__(self, input_data: SEEKABLE_DATA_TYPE) -> None:
+        reader = ReplayReader(input_data)
+        ReplayHeader(reader)
+        self.data: bytes = reader.get_data()
+        self.body_offset: int = reader.offset()
+        self.offsets: Dict[int, array] = {}
+        self.ticks: Dict[int, array] = {}
+        self._build()
+
+    def _build(self) -> None:
+        offsets = ticks = None
+        for tick, player_id, command_type, start, _ in iter_tick_frames(self.data, self.body_offset):
+            if command_type == CommandStates.SetCommandSource:
+                offsets = self.offsets.get(player_id)
+                if offsets is None:
+                    offsets = self.offsets[player_id] = array("Q")
+                    self.ticks[player_id] = array("I")
+                ticks = self.ticks[player_id]
+            elif command_type != CommandStates.Advance and offsets is not None:
+                offsets.append(start)
+                ticks.append(tick)
+
+    def players(self) -> List[int]:
+        return sorted(self.offsets)
+
+    def iter_frames(self, player_id: int) -> Iterator[Tuple[int, int, memoryview]]:
+        """
+        Yields tick, command type and raw frame of every command of player
+        """
+        data = memoryview(self.data)
+        unpack_from = FRAME_HEAD.unpack_from
+        for offset, tick in zip(self.offsets.get(player_id, ()), self.ticks.get(player_id, ())):
+            command_type, command_length = unpack_from(data, offset)
+            yield tick, command_type, data[offset:offset + command_length]
+
+    def iter_commands(
+            self,
+            player_id: int,
+            command_types: Optional[Container[int]] = None,
+    ) -> Iterator[Tuple[int, int, Dict[str, Any]]]:
+        """
+        Yields tick, command type and parsed command of player
+
+        :param int player_id: command source
+        :param command_types: parses only these commands, all when not set
+        """
+        reader = ReplayReader()
+        for tick, command_type, frame in self.iter_frames(player_id):
+            if command_types is not None and command_type not in command_types:
+                continue
+            reader.set_data_from_bytes(frame[FRAME_HEAD_SIZE:])
+            yield tick, command_type, COMMAND_PARSERS[command_type](reader)
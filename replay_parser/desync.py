@@ -0,0 +1,120 @@
+from itertools import groupby, zip_longest
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from replay_parser.body import ReplayBody
+from replay_parser.commands import COMMAND_PARSERS
+from replay_parser.constants import CommandStateNames, CommandStates
+from replay_parser.frames import FRAME_HEAD_SIZE
+from replay_parser.header import ReplayHeader
+from replay_parser.reader import ACCEPTABLE_DATA_TYPE, ReplayReader
+
+__all__ = ('Divergence', 'compare_replays')
+
+TYPE_FRAME = Tuple[int, int, bytes]  # player id, command type, raw command frame
+
+DESYNC_COMMANDS = {CommandStates.Advance, CommandStates.SetCommandSource, CommandStates.VerifyChecksum}
+
+
+class Divergence:
+    """
+    First place, where compared replays differ.
+
+    `reason` is one of:
+        * `command` - replays have different command at `index` of tick
+        * `tick` - some replays have no commands at `tick`, their next commands are at later tick
+        * `end` - some replays end earlier
+        * `desync` - replay has different checksums for one beat, see `ReplayBody.get_desync_ticks`
+    """
+
+    __slots__ = ("tick", "index", "reason", "frames")
+
+    def __init__(self, tick: int, index: int, reason: str, frames: List[Optional[TYPE_FRAME]]) -> None:
+        self.tick = tick
+        self.index = index
+        self.reason = reason
+        self.frames = frames
+
+    def commands(self) -> List[Optional[Dict[str, Any]]]:
+        """
+        Returns decoded divergent command of every replay, `None` for replays without command
+        """
+        reader = ReplayReader()
+        result = []
+        for frame in self.frames:
+            if frame is None:
+                result.append(None)
+                continue
+            player_id, command_type, data = frame
+            reader.set_data_from_bytes(data[FRAME_HEAD_SIZE:])
+            result.append({
+                "player_id": player_id,
+                "command": CommandStateNames[command_type],
+                "data": COMMAND_PARSERS[command_type](reader),
+            })
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"tick": self.tick, "index": self.index, "reason": self.reason, "commands": self.commands()}
+
+
+def _iter_ticks(body: ReplayBody) -> Iterator[Tuple[int, List[TYPE_FRAME], Optional[int]]]:
+    """
+    Yields tick, its frames and index of frame, where desync was found
+    """
+    def frames() -> Iterator[Tuple[int, TYPE_FRAME, bool]]:
+        desyncs = 0
+        for tick, command_type, data in body.continuous_parse():
+            desync = len(body.desync_ticks) != desyncs
+            desyncs = len(body.desync_ticks)
+            yield tick, (body.player_id, command_type, data), desync
+
+    for tick, rows in groupby(frames(), key=itemgetter(0)):
+        tick_frames, desync_index = [], None
+        for index, (_, frame, desync) in enumerate(rows):
+            tick_frames.append(frame)
+            if desync and desync_index is None:
+                desync_index = index
+        yield tick, tick_frames, desync_index
+
+
+def compare_replays(*inputs: ACCEPTABLE_DATA_TYPE) -> Optional[Divergence]:
+    """
+    Streams replays of one game tick by tick and returns first divergence or `None`.
+    Only one tick of every replay is kept in memory.
+    ::
+        >>> compare_replays(FileIO("8748707.scfareplay"), FileIO("8748707-dragonite.scfareplay"))
+    """
+    streams = []
+    for input_data in inputs:
+        reader = ReplayReader(input_data)
+        ReplayHeader(reader)
+        streams.append(_iter_ticks(ReplayBody(reader, parse_commands=DESYNC_COMMANDS)))
+
+    # next unread tick of every stream, only streams at lowest tick are moved forward
+    chunks = [next(stream, None) for stream in streams]
+    while True:
+        present = [chunk for chunk in chunks if chunk is not None]
+        if not present:
+            return None
+
+        tick = min(chunk[0] for chunk in present)
+        if len(present) != len(chunks) or any(chunk[0] != tick for chunk in present):
+            frames = [chunk[1][0] if chunk is not None and chunk[0] == tick else None for chunk in chunks]
+            return Divergence(tick, 0, "tick" if len(present) == len(chunks) else "end", frames)
+
+        desync_indexes = [chunk[2] for chunk in chunks if chunk[2] is not None]
+        first_desync = min(desync_indexes) if desync_indexes else None
+
+        for index, frames in enumerate(zip_longest(*(chunk[1] for chunk in chunks))):
+            if any(frame != frames[0] for frame in frames):
+                # stream without more commands in tick ended, when it has no next tick
+                ended = any(
+                    frame is None and next(streams[stream_index], None) is None
+                    for stream_index, frame in enumerate(frames)
+                )
+                return Divergence(tick, index, "end" if ended else "command", list(frames))
+            if index == first_desync:
+                return Divergence(tick, index, "desync", list(frames))
+
+        chunks = [next(stream, None) for stream in streams]
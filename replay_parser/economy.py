@@ -0,0 +1,111 @@
+import struct
+from array import array
+from typing import Dict, Iterable
+
+from replay_parser.constants import CommandStates
+from replay_parser.exception import InvalidReplay
+from replay_parser.frames import FRAME_HEAD_SIZE, iter_tick_frames
+from replay_parser.header import ReplayHeader
+from replay_parser.messages import chat_message
+from replay_parser.reader import SEEKABLE_DATA_TYPE, ReplayReader
+
+__all__ = ('ResourceTransfers', 'EconomyAggregate', 'aggregate_economy', 'DEFAULT_CALLBACKS')
+
+RESOURCES_CALLBACK = "GiveResourcesToPlayer"
+DEFAULT_CALLBACKS = frozenset((RESOURCES_CALLBACK, "GiveUnitsToPlayer", "CapMex", "Rebuild", "AutoOvercharge"))
+
+
+class ResourceTransfers:
+    """
+    Resources sent by one player, rows with same index belong to one transfer.
+    Armies are 1-based indexes used by game Lua.
+    """
+
+    __slots__ = ("tick", "from_army", "to_army", "mass", "energy")
+
+    def __init__(self) -> None:
+        self.tick = array("I")
+        self.from_army = array("b")
+        self.to_army = array("b")
+        self.mass = array("f")
+        self.energy = array("f")
+
+    def __len__(self) -> int:
+        return len(self.tick)
+
+
+class EconomyAggregate:
+    """
+    Result of `aggregate_economy`:
+        * `transfers` - player id to `ResourceTransfers`, chat messages aren't included
+        * `callbacks` - callback name to player id to ticks of callback calls
+    """
+
+    __slots__ = ("transfers", "callbacks")
+
+    def __init__(self) -> None:
+        self.transfers: Dict[int, ResourceTransfers] = {}
+        self.callbacks: Dict[str, Dict[int, array]] = {}
+
+
+def aggregate_economy(
+        input_data: SEEKABLE_DATA_TYPE,
+        callbacks: Iterable[str] = DEFAULT_CALLBACKS,
+) -> EconomyAggregate:
+    """
+    Collects `LuaSimCallback` calls of every player in single pass over command frames.
+    Callback name is compared as bytes, other callbacks are skipped without decoding.
+    Only `GiveResourcesToPlayer` Lua table is decoded for resource transfers.
+
+    :param input_data: data source
+    :param callbacks: names of callbacks, which calls are counted
+    """
+    reader = ReplayReader(input_data)
+    ReplayHeader(reader)
+    data = reader.get_data()
+    command_reader = ReplayReader()
+
+    callback_names = {name.encode(): name for name in callbacks}
+    resources_callback = RESOURCES_CALLBACK.encode()
+    find_name_end = data.index
+
+    result = EconomyAggregate()
+    for tick, player_id, command_type, start, end in iter_tick_frames(data, reader.offset()):
+        if command_type == CommandStates.LuaSimCallback:
+            try:
+                name_end = find_name_end(b"\x00", start + FRAME_HEAD_SIZE, end)
+            except ValueError as e:
+                raise InvalidReplay("Callback without name at offset {}".format(start)) from e
+            lua_name = data[start + FRAME_HEAD_SIZE:name_end]
+            if lua_name not in callback_names:
+                continue
+
+            player_calls = result.callbacks.setdefault(callback_names[lua_name], {})
+            player_calls.setdefault(player_id, array("I")).append(tick)
+            if lua_name != resources_callback:
+                continue
+
+            command_reader.set_data_from_bytes(data[name_end + 1:end])
+            try:
+                lua = command_reader.read_lua()
+                if chat_message(lua) is not None or not lua:
+                    continue
+                from_army, to_army = int(lua.get("From", -1)), int(lua.get("To", -1))
+                mass, energy = float(lua.get("Mass", 0.0)), float(lua.get("Energy", 0.0))
+                if not (-128 <= from_army < 128 and -128 <= to_army < 128):
+                    raise ValueError("army index out of range")
+            except (struct.error, ValueError, TypeError, OverflowError) as e:
+                raise InvalidReplay(
+                    "Can't parse {} at offset {}: {}".format(RESOURCES_CALLBACK, start, e)
+                ) from e
+
+            transfers = result.transfers.get(player_id)
+            if transfers is None:
+                transfers = result.transfers[player_id] = ResourceTransfers()
+            transfers.tick.append(tick)
+            transfers.from_army.append(from_army)
+            transfers.to_army.append(to_army)
+            transfers.mass.append(mass)
+            transfers.energy.append(energy)
+
+    return result
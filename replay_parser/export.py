@@ -0,0 +1,93 @@
+import json
+from base64 import b64encode
+from typing import Any, Dict, Iterable, Optional, TextIO
+
+from replay_parser.body import ReplayBody
+from replay_parser.commands import COMMAND_PARSERS
+from replay_parser.constants import CommandStateNames
+from replay_parser.header import ReplayHeader
+from replay_parser.reader import ACCEPTABLE_DATA_TYPE, ReplayReader
+
+__all__ = ('ReplayJSONEncoder', 'write_ndjson')
+
+BYTES_ENCODERS = {
+    "hex": lambda value: bytes(value).hex(),
+    "base64": lambda value: b64encode(value).decode(),
+}
+
+
+class ReplayJSONEncoder(json.JSONEncoder):
+    """
+    JSON encoder for parser output, encodes bytes as hex or base64 strings.
+    """
+
+    def __init__(self, *args: Any, bytes_encoding: str = "hex", **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        try:
+            self.encode_bytes = BYTES_ENCODERS[bytes_encoding]
+        except KeyError:
+            raise ValueError("Unknown bytes encoding {}, use one of {}".format(
+                bytes_encoding, ", ".join(BYTES_ENCODERS)
+            ))
+
+    def default(self, o: Any) -> Any:
+        if isinstance(o, (bytes, bytearray, memoryview)):
+            return self.encode_bytes(o)
+        return super().default(o)
+
+
+def write_ndjson(
+        input_data: ACCEPTABLE_DATA_TYPE,
+        output: TextIO,
+        fields: Dict[int, Optional[Iterable[str]]] = None,
+        bytes_encoding: str = "hex",
+        write_header: bool = True,
+        **kwargs
+) -> int:
+    """
+    Writes replay as newline delimited JSON while parsing, body isn't kept in memory.
+    First line is `{"header": ..., "body_offset": ...}`, then one line per command
+    with `tick`, `player_id`, `command` name and command fields in `data`. Command fields are kept apart,
+    because some commands have own `tick` (e.g. `VerifyChecksum`).
+
+    :param input_data: data source
+    :param TextIO output: text stream for lines
+    :param dict fields: command id to names of exported fields, `None` exports all fields.
+        Only commands from keys are exported, all commands when empty.
+    :param str bytes_encoding: `hex` or `base64`
+    :param bool write_header: write header line
+    :return: number of written command lines
+    """
+    encode = ReplayJSONEncoder(bytes_encoding=bytes_encoding).encode
+    reader = ReplayReader(input_data, **kwargs)
+    header = ReplayHeader(reader)
+    if write_header:
+        output.write(encode({"header": header.to_dict(), "body_offset": reader.offset()}))
+        output.write("\n")
+
+    written = 0
+
+    def write_command(command_name: str, field_names: Optional[tuple]):
+        def handler(tick: int, player_id: int, command_data: Dict) -> None:
+            nonlocal written
+            if field_names is not None:
+                command_data = {field_name: command_data[field_name] for field_name in field_names}
+            line = {"tick": tick, "player_id": player_id, "command": command_name, "data": command_data}
+            output.write(encode(line))
+            output.write("\n")
+            written += 1
+        return handler
+
+    if not fields:
+        fields = dict.fromkeys(COMMAND_PARSERS)
+
+    handlers = {
+        command_type: write_command(
+            CommandStateNames[command_type],
+            None if field_names is None else tuple(field_names),
+        )
+        for command_type, field_names in fields.items()
+    }
+    kwargs.pop("store_body", None)
+    ReplayBody(reader, handlers=handlers, **kwargs).parse()
+    return written
@@ -0,0 +1,88 @@
+import struct
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+from replay_parser.body import ReplayBody
+from replay_parser.constants import CommandStates
+from replay_parser.frames import FRAME_HEAD, FRAME_HEAD_SIZE
+from replay_parser.header import ReplayHeader
+from replay_parser.reader import ReplayReader
+
+__all__ = ('follow',)
+
+
+def complete_frames_end(data: bytearray) -> int:
+    """
+    Returns end of last complete frame in data, invalid frame is treated as complete,
+    so `ReplayBody` can report it.
+    """
+    offset = 0
+    size = len(data)
+    unpack_from = FRAME_HEAD.unpack_from
+    while offset + FRAME_HEAD_SIZE <= size:
+        command_length = unpack_from(data, offset)[1]
+        if command_length < FRAME_HEAD_SIZE:
+            return size
+        if offset + command_length > size:
+            break
+        offset += command_length
+    return offset
+
+
+def follow(
+        path: str,
+        poll_interval: float = 1.0,
+        idle_timeout: Optional[float] = None,
+        **kwargs: Any
+) -> Iterator[Union[Dict[str, Any], Tuple]]:
+    """
+    Parses replay, that is still written. Yields same items as `continuous_parse` with `parse_header`.
+
+    File is polled for new data every `poll_interval` seconds, read bytes aren't read again.
+    Header is yielded, when it's complete, body commands are parsed only from complete frames,
+    partial frame at end of file waits for next data. Following stops after `EndGame` command.
+
+    :param str path: replay file
+    :param float poll_interval: seconds between checks of file size
+    :param float idle_timeout: stops, when file doesn't grow for this number of seconds, never by default
+    :param kwargs: options of `ReplayReader` and `ReplayBody`
+    """
+    pending = bytearray()
+    body: Optional[ReplayBody] = None
+    last_growth = time.monotonic()
+
+    with open(path, "rb") as replay_file:
+        while True:
+            chunk = replay_file.read()
+            if chunk:
+                pending += chunk
+                last_growth = time.monotonic()
+
+                if body is None:
+                    reader = ReplayReader(bytes(pending), **kwargs)
+                    try:
+                        header = ReplayHeader(reader)
+                    except (struct.error, ValueError, UnicodeDecodeError):
+                        header = None  # header isn't written whole yet
+
+                    if header is not None:
+                        body_offset = reader.offset()
+                        yield {"header": header.to_dict(), "body_offset": body_offset}
+                        del pending[:body_offset]
+                        body = ReplayBody(ReplayReader(**kwargs), **kwargs)
+
+                if body is not None:
+                    frames_end = complete_frames_end(pending)
+                    if frames_end:
+                        ended = False
+                        for row in body.continuous_parse(bytes(pending[:frames_end])):
+                            ended = ended or row[1] == CommandStates.EndGame
+                            yield row
+                        del pending[:frames_end]
+                        if ended or body.stopped:
+                            return
+
+            elif idle_timeout is not None and time.monotonic() - last_growth >= idle_timeout:
+                return
+            else:
+                time.sleep(poll_interval)
@@ -0,0 +1,141 @@
+from struct import Struct
+from typing import Iterator, Optional, Tuple, Union
+
+from replay_parser.constants import CommandStateNames, CommandStates
+from replay_parser.exception import InvalidReplay
+
+__all__ = (
+    'FRAME_HEAD', 'UINT', 'iter_frames', 'iter_tick_frames', 'is_valid_frame', 'validate_frames', 'find_next_frame',
+)
+
+TYPE_FRAME_DATA = Union[bytes, bytearray, memoryview]
+
+# command type byte and command length short, length includes this head
+FRAME_HEAD = Struct("<BH")
+FRAME_HEAD_SIZE = FRAME_HEAD.size
+UINT = Struct("<I")
+MAX_COMMAND_TYPE = len(CommandStateNames) - 1
+
+# frame lengths of commands with fixed size
+FIXED_FRAME_LENGTHS = {
+    CommandStates.Advance: FRAME_HEAD_SIZE + 4,
+    CommandStates.SetCommandSource: FRAME_HEAD_SIZE + 1,
+    CommandStates.CommandSourceTerminated: FRAME_HEAD_SIZE,
+    CommandStates.VerifyChecksum: FRAME_HEAD_SIZE + 16 + 4,
+    CommandStates.RequestPause: FRAME_HEAD_SIZE,
+    CommandStates.Resume: FRAME_HEAD_SIZE,
+    CommandStates.SingleStep: FRAME_HEAD_SIZE,
+    CommandStates.DestroyEntity: FRAME_HEAD_SIZE + 4,
+    CommandStates.IncreaseCommandCount: FRAME_HEAD_SIZE + 4 + 4,
+    CommandStates.DecreaseCommandCount: FRAME_HEAD_SIZE + 4 + 4,
+    CommandStates.SetCommandType: FRAME_HEAD_SIZE + 4 + 4,
+    CommandStates.RemoveCommandFromQueue: FRAME_HEAD_SIZE + 4 + 4,
+    CommandStates.EndGame: FRAME_HEAD_SIZE,
+}
+
+
+def iter_frames(data: TYPE_FRAME_DATA, offset: int = 0) -> Iterator[Tuple[int, int, int]]:
+    """
+    Walks over command frames of replay body without decoding them.
+    Yields command type, offset of frame start and offset of frame end.
+    Command data are in `data[start + FRAME_HEAD_SIZE:end]`.
+    Raises `InvalidReplay` at frame with invalid length or truncated frame, use `ReplayBody` with
+    `recover` to read broken replays.
+
+    :param data: whole replay or replay body
+    :param int offset: position of first frame, usually `body_offset`
+    """
+    unpack_from = FRAME_HEAD.unpack_from
+    data_size = len(data)
+    while offset + FRAME_HEAD_SIZE <= data_size:
+        command_type, command_length = unpack_from(data, offset)
+        frame_end = offset + command_length
+        if command_length < FRAME_HEAD_SIZE or frame_end > data_size:
+            raise InvalidReplay("Invalid command {} with length {} at offset {}".format(
+                command_type, command_length, offset
+            ))
+        yield command_type, offset, frame_end
+        offset = frame_end
+
+    if offset < data_size:
+        raise InvalidReplay("Truncated command at offset {}".format(offset))
+
+
+def iter_tick_frames(data: TYPE_FRAME_DATA, offset: int = 0) -> Iterator[Tuple[int, int, int, int, int]]:
+    """
+    Same as `iter_frames`, but keeps tick and player like `ReplayBody` does.
+    Yields tick, player id, command type, offset of frame start and offset of frame end.
+    `Advance` and `SetCommandSource` are yielded with tick and player they set,
+    player id is -1 before first `SetCommandSource`.
+    """
+    unpack_uint = UINT.unpack_from
+    tick = 0
+    player_id = -1
+    for command_type, start, end in iter_frames(data, offset):
+        if command_type == CommandStates.Advance or command_type == CommandStates.SetCommandSource:
+            if end - start != FIXED_FRAME_LENGTHS[command_type]:
+                raise InvalidReplay("Invalid command {} with length {} at offset {}".format(
+                    command_type, end - start, start
+                ))
+            if command_type == CommandStates.Advance:
+                tick += unpack_uint(data, start + FRAME_HEAD_SIZE)[0]
+            else:
+                player_id = data[start + FRAME_HEAD_SIZE]
+        yield tick, player_id, command_type, start, end
+
+
+def is_valid_frame(data: TYPE_FRAME_DATA, offset: int) -> bool:
+    """
+    Checks, that frame at offset has known command type, its length fits into data
+    and it's same as length of commands with fixed size.
+    """
+    if offset + FRAME_HEAD_SIZE > len(data):
+        return False
+    command_type, command_length = FRAME_HEAD.unpack_from(data, offset)
+    return (
+        command_type <= MAX_COMMAND_TYPE
+        and command_length >= FRAME_HEAD_SIZE
+        and offset + command_length <= len(data)
+        and FIXED_FRAME_LENGTHS.get(command_type, command_length) == command_length
+    )
+
+
+def validate_frames(data: TYPE_FRAME_DATA, offset: int = 0) -> Optional[int]:
+    """
+    Checks framing of whole body without decoding commands.
+    Returns offset of first invalid or truncated frame, `None` when body is valid.
+    """
+    unpack_from = FRAME_HEAD.unpack_from
+    data_size = len(data)
+    while offset < data_size:
+        if offset + FRAME_HEAD_SIZE > data_size:
+            return offset
+        command_type, command_length = unpack_from(data, offset)
+        if (
+            command_type > MAX_COMMAND_TYPE
+            or command_length < FRAME_HEAD_SIZE
+            or offset + command_length > data_size
+            or FIXED_FRAME_LENGTHS.get(command_type, command_length) != command_length
+        ):
+            return offset
+        offset += command_length
+    return None
+
+
+def find_next_frame(data: TYPE_FRAME_DATA, offset: int, lookahead: int = 3) -> Optional[int]:
+    """
+    Searches for first offset, where `lookahead` consecutive frames are valid
+    (or valid frames reach end of data). Used for resync after corrupted frame.
+    """
+    data_size = len(data)
+    for start in range(offset, data_size - FRAME_HEAD_SIZE + 1):
+        position = start
+        for _ in range(lookahead):
+            if not is_valid_frame(data, position):
+                break
+            position += FRAME_HEAD.unpack_from(data, position)[1]
+            if position == data_size:
+                return start
+        else:
+            return start
+    return None
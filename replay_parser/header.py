@@ -1,6 +1,79 @@
+from collections import OrderedDict
+from hashlib import blake2b
+from threading import Lock
 from typing import Dict
 
-from replay_parser.reader import ReplayReader
+from replay_parser.reader import TYPE_LUA, ReplayReader
+
+__all__ = ('ReplayHeader', 'FrozenDict', 'LuaBlobCache', 'lua_blobs')
+
+
+class FrozenDict(dict):
+    """
+    Read-only dict, it's shared by headers of different replays. Copy it with `dict(...)` to change it.
+    """
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("FrozenDict is read-only")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _read_only
+    __ior__ = _read_only
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+
+def freeze_lua(value: TYPE_LUA) -> TYPE_LUA:
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze_lua(item)) for key, item in value.items())
+    return value
+
+
+class LuaBlobCache:
+    """
+    Process-wide LRU cache of decoded Lua blobs of header, keyed by hash of raw bytes.
+    Same scenario or mods of different replays are decoded once and shared as `FrozenDict`.
+    """
+
+    __slots__ = ("maxsize", "blobs", "lock", "hits", "misses")
+
+    def __init__(self, maxsize: int = 256) -> None:
+        """
+        :param int maxsize: number of kept blobs, least recently used blob is removed
+        """
+        self.maxsize = maxsize
+        self.blobs: Dict[bytes, TYPE_LUA] = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.blobs)
+
+    def decode(self, raw: bytes) -> TYPE_LUA:
+        key = blake2b(raw, digest_size=16).digest()
+        with self.lock:
+            if key in self.blobs:
+                self.blobs.move_to_end(key)
+                self.hits += 1
+                return self.blobs[key]
+
+        value = freeze_lua(ReplayReader(raw).read_lua())
+        with self.lock:
+            self.misses += 1
+            value = self.blobs.setdefault(key, value)
+            self.blobs.move_to_end(key)
+            while len(self.blobs) > self.maxsize:
+                self.blobs.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self.lock:
+            self.blobs.clear()
+            self.hits = self.misses = 0
+
+
+lua_blobs = LuaBlobCache()
 
 
 class ReplayHeader:
@@ -20,10 +93,10 @@ class ReplayHeader:
         self.replay_version, self.map_name = reader.read_string().split("\r\n", 1)
         reader.read(4)
 
-        reader.read_uint()  # mods_size
-        self.mods = reader.read_lua()
-        reader.read_uint()  # scenario_size
-        self.scenario = reader.read_lua()
+        mods_size = reader.read_uint()
+        self.mods = lua_blobs.decode(reader.read(mods_size))
+        scenario_size = reader.read_uint()
+        self.scenario = lua_blobs.decode(reader.read(scenario_size))
         sources_number = reader.read_byte()
 
         self.players = {}
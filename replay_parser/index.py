@@ -0,0 +1,224 @@
+import argparse
+import os
+import sqlite3
+import struct
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from replay_parser.body import ReplayBody
+from replay_parser.constants import CommandStates
+from replay_parser.exception import InvalidReplay
+from replay_parser.header import ReplayHeader
+from replay_parser.reader import ReplayReader
+
+__all__ = ('ReplayIndex',)
+
+REPLAY_EXTENSION = ".scfareplay"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS replays (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    version TEXT,
+    replay_version TEXT,
+    map_name TEXT,
+    random_seed INTEGER,
+    cheats_enabled INTEGER,
+    last_tick INTEGER,
+    desynced INTEGER,
+    first_desync_tick INTEGER
+);
+CREATE TABLE IF NOT EXISTS players (
+    replay_path TEXT NOT NULL REFERENCES replays(path) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    player_id INTEGER
+);
+CREATE TABLE IF NOT EXISTS armies (
+    replay_path TEXT NOT NULL REFERENCES replays(path) ON DELETE CASCADE,
+    source INTEGER NOT NULL,
+    player_name TEXT,
+    faction INTEGER,
+    team INTEGER
+);
+CREATE TABLE IF NOT EXISTS invalid_replays (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS replays_map_name ON replays(map_name);
+CREATE INDEX IF NOT EXISTS players_name ON players(name);
+CREATE INDEX IF NOT EXISTS players_replay_path ON players(replay_path);
+CREATE INDEX IF NOT EXISTS armies_player_name ON armies(player_name);
+CREATE INDEX IF NOT EXISTS armies_replay_path ON armies(replay_path);
+"""
+
+# commands needed for last tick and desyncs
+INDEX_COMMANDS = {CommandStates.Advance, CommandStates.SetCommandSource, CommandStates.VerifyChecksum}
+
+
+def _int_or_none(value: Any) -> Optional[int]:
+    return None if value is None else int(value)
+
+
+class ReplayIndex:
+    """
+    SQLite index of replay headers, players and armies.
+    ::
+        >>> index = ReplayIndex("replays.sqlite")
+        >>> index.update("/path/to/replays")
+        >>> index.find(map_name="SCMP_009", player_name="Zock")
+    """
+
+    def __init__(self, database: str = ":memory:", batch_size: int = 100) -> None:
+        """
+        :param str database: path to sqlite database
+        :param int batch_size: number of replays written in one transaction
+        """
+        self.connection = sqlite3.connect(database)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+        self.batch_size = max(int(batch_size), 1)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def update(self, directory: str) -> Dict[str, int]:
+        """
+        Indexes new and changed replays from directory (recursively), changes are detected by mtime and size.
+        Replays, that don't exist anymore, are removed from index. Invalid replays are remembered too,
+        so they're parsed again only after change, changed replay, that became invalid, is removed.
+
+        :return: number of indexed, unchanged, removed and invalid replays
+        """
+        known = {
+            path: (mtime, size)
+            for path, mtime, size in self.connection.execute("SELECT path, mtime, size FROM replays")
+        }
+        known_invalid = {
+            path: (mtime, size)
+            for path, mtime, size in self.connection.execute("SELECT path, mtime, size FROM invalid_replays")
+        }
+        stats = {"indexed": 0, "unchanged": 0, "removed": 0, "invalid": 0}
+
+        batch, invalid = [], []
+        for path, mtime, size in self._iter_replay_files(directory):
+            if known.pop(path, None) == (mtime, size):
+                stats["unchanged"] += 1
+                continue
+            if known_invalid.pop(path, None) == (mtime, size):
+                stats["invalid"] += 1
+                continue
+
+            rows = self._read_replay(path, mtime, size)
+            if rows is None:
+                stats["invalid"] += 1
+                invalid.append((path, mtime, size))
+            else:
+                batch.append(rows)
+            if len(batch) + len(invalid) >= self.batch_size:
+                stats["indexed"] += self._write_batch(batch, invalid)
+                batch, invalid = [], []
+        stats["indexed"] += self._write_batch(batch, invalid)
+
+        directory = os.path.abspath(directory)
+        removed = [(path,) for path in known if path.startswith(directory + os.sep)]
+        removed_invalid = [(path,) for path in known_invalid if path.startswith(directory + os.sep)]
+        with self.connection:
+            self.connection.executemany("DELETE FROM replays WHERE path = ?", removed)
+            self.connection.executemany("DELETE FROM invalid_replays WHERE path = ?", removed_invalid)
+        stats["removed"] = len(removed)
+        return stats
+
+    def find(self, map_name: str = None, player_name: str = None) -> List[str]:
+        """
+        Returns paths of replays filtered by map and player name
+        """
+        query = "SELECT DISTINCT replays.path FROM replays"
+        conditions, params = [], []
+        if player_name is not None:
+            query += " JOIN players ON players.replay_path = replays.path"
+            conditions.append("players.name = ?")
+            params.append(player_name)
+        if map_name is not None:
+            conditions.append("replays.map_name = ?")
+            params.append(map_name)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        return [path for path, in self.connection.execute(query + " ORDER BY replays.path", params)]
+
+    @staticmethod
+    def _iter_replay_files(directory: str) -> Iterator[Tuple[str, float, int]]:
+        for root, _, file_names in os.walk(os.path.abspath(directory)):
+            for file_name in sorted(file_names):
+                if not file_name.endswith(REPLAY_EXTENSION):
+                    continue
+                path = os.path.join(root, file_name)
+                stat = os.stat(path)
+                yield path, stat.st_mtime, stat.st_size
+
+    @staticmethod
+    def _read_replay(path: str, mtime: float, size: int) -> Optional[Tuple[Tuple, List[Tuple], List[Tuple]]]:
+        with open(path, "rb") as f:
+            reader = ReplayReader(f.read())
+
+        try:
+            header = ReplayHeader(reader)
+            body = ReplayBody(reader, parse_commands=INDEX_COMMANDS)
+            body.parse()
+        except (InvalidReplay, ValueError, struct.error):
+            return None
+
+        desync_ticks = body.get_desync_ticks()
+        replay = (
+            path, mtime, size, header.version, header.replay_version, header.map_name,
+            header.random_seed, header.cheats_enabled, body.tick,
+            bool(desync_ticks), desync_ticks[0] if desync_ticks else None,
+        )
+        players = [(path, name, _int_or_none(player_id)) for name, player_id in header.players.items()]
+        armies = [
+            (path, source, army.get("PlayerName"), _int_or_none(army.get("Faction")), _int_or_none(army.get("Team")))
+            for source, army in header.armies.items()
+        ]
+        return replay, players, armies
+
+    def _write_batch(
+            self,
+            batch: List[Tuple[Tuple, List[Tuple], List[Tuple]]],
+            invalid: List[Tuple[str, float, int]],
+    ) -> int:
+        if not batch and not invalid:
+            return 0
+
+        paths = [(rows[0][0],) for rows in batch] + [(path,) for path, _, _ in invalid]
+        with self.connection:
+            self.connection.executemany("DELETE FROM replays WHERE path = ?", paths)
+            self.connection.executemany("DELETE FROM invalid_replays WHERE path = ?", paths)
+            self.connection.executemany(
+                "INSERT INTO replays VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", [rows[0] for rows in batch]
+            )
+            self.connection.executemany(
+                "INSERT INTO players VALUES (?, ?, ?)", [player for rows in batch for player in rows[1]]
+            )
+            self.connection.executemany(
+                "INSERT INTO armies VALUES (?, ?, ?, ?, ?)", [army for rows in batch for army in rows[2]]
+            )
+            self.connection.executemany("INSERT INTO invalid_replays VALUES (?, ?, ?)", invalid)
+        return len(batch)
+
+
+def main(args: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Indexes replay headers from directory to sqlite database")
+    parser.add_argument("directory", help="directory with .scfareplay files")
+    parser.add_argument("database", help="sqlite database file")
+    parser.add_argument("--batch-size", type=int, default=100, help="replays written in one transaction")
+    options = parser.parse_args(args)
+
+    index = ReplayIndex(options.database, batch_size=options.batch_size)
+    try:
+        print(index.update(options.directory))
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
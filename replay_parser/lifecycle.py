@@ -0,0 +1,167 @@
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from replay_parser.body import ReplayBody
+from replay_parser.constants import CommandStates
+from replay_parser.header import ReplayHeader
+from replay_parser.reader import ACCEPTABLE_DATA_TYPE, ReplayReader
+
+__all__ = ('CommandLifecycle', 'CommandLifecycleTracker', 'iter_lifecycles')
+
+LIFECYCLE_COMMANDS = (
+    CommandStates.IssueCommand,
+    CommandStates.IssueFactoryCommand,
+    CommandStates.IncreaseCommandCount,
+    CommandStates.DecreaseCommandCount,
+    CommandStates.SetCommandTarget,
+    CommandStates.SetCommandType,
+    CommandStates.SetCommandCells,
+    CommandStates.RemoveCommandFromQueue,
+)
+
+
+class CommandLifecycle:
+    """
+    Order from its issue to its end, changes are lists of `(tick, value)`.
+
+    `end_reason` is one of:
+        * `removed` - order was removed from queues of all its units
+        * `reissued` - game reused command id for new order
+        * `evicted` - tracker had too many live orders
+        * `replay_end` - replay ended
+    """
+
+    __slots__ = (
+        "command_id", "player_id", "issue_tick", "factory", "action_type", "blueprint_id", "unit_ids",
+        "target", "retargets", "count_changes", "type_changes", "cells_changes", "removed_units",
+        "end_tick", "end_reason",
+    )
+
+    def __init__(self, tick: int, player_id: int, command: Dict[str, Any]) -> None:
+        cmd_data = command["cmd_data"]
+        self.command_id: int = cmd_data["command_id"]
+        self.player_id = player_id
+        self.issue_tick = tick
+        self.factory = command["type"] == "factory_issue"
+        self.action_type: int = cmd_data["command_type"]
+        self.blueprint_id: str = cmd_data["blueprint_id"]
+        self.unit_ids = command["entity_ids_set"]["unit_ids"]
+        self.target = cmd_data["target"]
+        self.retargets: List[Tuple[int, Dict]] = []
+        self.count_changes: List[Tuple[int, int]] = []
+        self.type_changes: List[Tuple[int, int]] = []
+        self.cells_changes: List[Tuple[int, Any]] = []
+        self.removed_units: List[Tuple[int, int]] = []
+        self.end_tick: Optional[int] = None
+        self.end_reason: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        ret = {}
+        for key_name in self.__slots__:
+            ret[key_name] = getattr(self, key_name)
+        return ret
+
+
+class CommandLifecycleTracker:
+    """
+    Applies command mutations to live orders indexed by command id.
+    Finished orders are returned from `feed` and aren't kept, at most `max_live` orders are tracked.
+    """
+
+    def __init__(self, max_live: int = 10000) -> None:
+        """
+        :param int max_live: oldest live order is finished as `evicted`, when there are more live orders
+        """
+        self.max_live = max(int(max_live), 1)
+        self.live: Dict[int, CommandLifecycle] = OrderedDict()
+        self.unknown_commands = 0
+
+    def feed(
+            self,
+            tick: int,
+            player_id: int,
+            command_type: int,
+            command: Dict[str, Any],
+    ) -> List[CommandLifecycle]:
+        """
+        Applies one parsed command, returns orders finished by it
+        """
+        if command_type in (CommandStates.IssueCommand, CommandStates.IssueFactoryCommand):
+            return self.issue(tick, player_id, command)
+
+        lifecycle = self.live.get(command["command_id"])
+        if lifecycle is None:
+            self.unknown_commands += 1
+            return []
+
+        if command_type == CommandStates.IncreaseCommandCount:
+            lifecycle.count_changes.append((tick, command["delta"]))
+        elif command_type == CommandStates.DecreaseCommandCount:
+            lifecycle.count_changes.append((tick, -command["delta"]))
+        elif command_type == CommandStates.SetCommandTarget:
+            lifecycle.retargets.append((tick, command["target"]))
+        elif command_type == CommandStates.SetCommandType:
+            lifecycle.type_changes.append((tick, command["target_id"]))
+        elif command_type == CommandStates.SetCommandCells:
+            lifecycle.cells_changes.append((tick, command["cells"]))
+        elif command_type == CommandStates.RemoveCommandFromQueue:
+            lifecycle.removed_units.append((tick, command["unit_id"]))
+            if len(lifecycle.removed_units) >= len(lifecycle.unit_ids):
+                return [self._finish(lifecycle.command_id, tick, "removed")]
+        return []
+
+    def issue(self, tick: int, player_id: int, command: Dict[str, Any]) -> List[CommandLifecycle]:
+        finished = []
+        lifecycle = CommandLifecycle(tick, player_id, command)
+        if lifecycle.command_id in self.live:
+            finished.append(self._finish(lifecycle.command_id, tick, "reissued"))
+        self.live[lifecycle.command_id] = lifecycle
+
+        while len(self.live) > self.max_live:
+            finished.append(self._finish(next(iter(self.live)), tick, "evicted"))
+        return finished
+
+    def finish_all(self, tick: int) -> List[CommandLifecycle]:
+        """
+        Finishes all live orders at end of replay
+        """
+        return [self._finish(command_id, tick, "replay_end") for command_id in list(self.live)]
+
+    def _finish(self, command_id: int, tick: int, reason: str) -> CommandLifecycle:
+        lifecycle = self.live.pop(command_id)
+        lifecycle.end_tick = tick
+        lifecycle.end_reason = reason
+        return lifecycle
+
+
+def iter_lifecycles(
+        input_data: ACCEPTABLE_DATA_TYPE,
+        max_live: int = 10000,
+        **kwargs: Any
+) -> Iterator[CommandLifecycle]:
+    """
+    Parses replay and yields lifecycle of every order, as soon as it's finished.
+    Only order related commands are decoded.
+    """
+    reader = ReplayReader(input_data, **kwargs)
+    ReplayHeader(reader)
+
+    tracker = CommandLifecycleTracker(max_live)
+    finished: Deque[CommandLifecycle] = deque()
+
+    def make_handler(command_type: int):
+        def handler(tick: int, player_id: int, command: Dict[str, Any]) -> None:
+            finished.extend(tracker.feed(tick, player_id, command_type, command))
+        return handler
+
+    kwargs.pop("store_body", None)
+    body = ReplayBody(
+        reader,
+        handlers={command_type: make_handler(command_type) for command_type in LIFECYCLE_COMMANDS},
+        **kwargs
+    )
+    for _ in body.continuous_parse():
+        while finished:
+            yield finished.popleft()
+
+    yield from tracker.finish_all(body.tick)
@@ -0,0 +1,68 @@
+import struct
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from replay_parser.constants import CommandStates
+from replay_parser.exception import InvalidReplay
+from replay_parser.frames import FRAME_HEAD_SIZE, iter_tick_frames
+from replay_parser.header import ReplayHeader
+from replay_parser.reader import SEEKABLE_DATA_TYPE, TYPE_LUA, ReplayReader
+
+__all__ = ('extract_messages', 'extract_messages_batch', 'chat_message')
+
+TYPE_MESSAGE = Tuple[str, str, str]
+
+MESSAGE_CALLBACK = b"GiveResourcesToPlayer\x00"
+
+
+def chat_message(lua: TYPE_LUA) -> Optional[TYPE_MESSAGE]:
+    """
+    Returns sender, receiver and text from `GiveResourcesToPlayer` table, `None` for resources transfer.
+    Raises `ValueError` for malformed table.
+    """
+    if not isinstance(lua, dict):
+        raise ValueError("GiveResourcesToPlayer data isn't table")
+    if "Msg" not in lua:
+        return None
+
+    message = lua["Msg"]
+    if "Sender" not in lua or not isinstance(message, dict) or "to" not in message or "text" not in message:
+        raise ValueError("Malformed chat message")
+    return lua["Sender"], message["to"], message["text"]
+
+
+def extract_messages(input_data: SEEKABLE_DATA_TYPE, command_reader: ReplayReader = None) -> Dict[int, TYPE_MESSAGE]:
+    """
+    Returns players messages same as `ReplayBody.get_messages`, but without parsing of body.
+    Only `Advance` commands and `LuaSimCallback` with chat are decoded, other commands are skipped by length.
+
+    :param input_data: data source
+    :param ReplayReader command_reader: reader for callback data, it can be shared between calls
+    """
+    reader = ReplayReader(input_data)
+    ReplayHeader(reader)
+    data = reader.get_data()
+    command_reader = command_reader or ReplayReader()
+
+    callback_start = FRAME_HEAD_SIZE + len(MESSAGE_CALLBACK)
+
+    messages = {}
+    for tick, _, command_type, start, end in iter_tick_frames(data, reader.offset()):
+        if command_type == CommandStates.LuaSimCallback and data.startswith(MESSAGE_CALLBACK, start + FRAME_HEAD_SIZE):
+            command_reader.set_data_from_bytes(data[start + callback_start:end])
+            try:
+                message = chat_message(command_reader.read_lua())
+            except (struct.error, ValueError) as e:
+                raise InvalidReplay("Can't parse chat message at offset {}: {}".format(start, e)) from e
+            if message is not None:
+                messages[tick] = message
+
+    return messages
+
+
+def extract_messages_batch(inputs: Iterable[SEEKABLE_DATA_TYPE]) -> Iterator[Dict[int, TYPE_MESSAGE]]:
+    """
+    Yields messages of every replay from inputs in same order.
+    """
+    command_reader = ReplayReader()
+    for input_data in inputs:
+        yield extract_messages(input_data, command_reader)
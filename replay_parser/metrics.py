@@ -0,0 +1,99 @@
+from time import perf_counter
+from typing import Any, Callable, Dict, Optional
+
+from replay_parser.constants import CommandStateNames
+
+__all__ = ('ParserMetrics',)
+
+
+class ParserMetrics:
+    """
+    Collects parsing counters: bytes read, commands per type and time spent in `COMMAND_PARSERS` entries.
+
+    Pass instance as `metrics` to `ReplayReader`, `ReplayBody` or `replay_parser.replay.parse`.
+    Without it parsers don't do any measurements.
+    ::
+        >>> metrics = ParserMetrics(sample_rate=10)
+        >>> parse(data, metrics=metrics)
+        >>> metrics.to_dict()
+    """
+
+    def __init__(
+            self,
+            sample_rate: int = 1,
+            callback: Optional[Callable[[Dict], Any]] = None,
+            callback_every: int = 0,
+    ) -> None:
+        """
+        :param int sample_rate: measures time of every n-th parsed command of each type, 0 disables timing
+        :param callable callback: receives `to_dict()` result on `flush`
+        :param int callback_every: calls callback also after every n-th command read from body
+        """
+        self.sample_rate = max(int(sample_rate), 0)
+        self.callback = callback
+        self.callback_every = max(int(callback_every), 0)
+        self.reset()
+
+    def reset(self) -> None:
+        commands_number = len(CommandStateNames)
+        self.bytes_loaded: int = 0
+        self.bytes_read: int = 0
+        self.commands_read: int = 0
+        self.commands_count = [0] * commands_number
+        self.commands_parsed = [0] * commands_number
+        self.commands_timed = [0] * commands_number
+        self.commands_time = [0.0] * commands_number
+
+    def count_loaded(self, size: int) -> None:
+        """
+        Counts bytes loaded into `ReplayReader`
+        """
+        self.bytes_loaded += size
+
+    def count_command(self, command_type: int, size: int) -> None:
+        """
+        Counts one command frame read from body, size includes frame head.
+        """
+        self.bytes_read += size
+        self.commands_count[command_type] += 1
+        self.commands_read += 1
+        if self.callback_every and self.commands_read % self.callback_every == 0:
+            self.flush()
+
+    def measure(self, command_type: int, command_parser: Callable, *args: Any) -> Any:
+        """
+        Runs command parser, time is measured only for sampled calls.
+        """
+        parsed = self.commands_parsed[command_type] + 1
+        self.commands_parsed[command_type] = parsed
+        if not self.sample_rate or parsed % self.sample_rate:
+            return command_parser(*args)
+
+        start = perf_counter()
+        result = command_parser(*args)
+        self.commands_time[command_type] += perf_counter() - start
+        self.commands_timed[command_type] += 1
+        return result
+
+    def flush(self) -> None:
+        if self.callback is not None:
+            self.callback(self.to_dict())
+
+    def to_dict(self) -> Dict[str, Any]:
+        commands = {}
+        for command_type, command_name in enumerate(CommandStateNames):
+            if not self.commands_count[command_type] and not self.commands_parsed[command_type]:
+                continue
+            commands[command_name] = {
+                "count": self.commands_count[command_type],
+                "parsed": self.commands_parsed[command_type],
+                "timed": self.commands_timed[command_type],
+                "time": self.commands_time[command_type],
+            }
+        return {
+            "bytes_loaded": self.bytes_loaded,
+            "bytes_read": self.bytes_read,
+            "commands_read": self.commands_read,
+            "sample_rate": self.sample_rate,
+            "commands": commands,
+        }
@@ -0,0 +1,131 @@
+import os
+from contextlib import contextmanager
+from queue import Empty, LifoQueue
+from threading import Lock
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from replay_parser.body import ReplayBody
+from replay_parser.header import ReplayHeader
+from replay_parser.reader import ACCEPTABLE_DATA_TYPE, ReplayReader
+
+__all__ = ('ReplayParser', 'ParserPool')
+
+# options with state, that can't be shared by parsers used from more threads
+PER_PARSER_OPTIONS = frozenset(("metrics", "handlers", "body_storage"))
+
+
+class ReplayParser:
+    """
+    Reusable replay parser. Readers, body parser and their buffers are kept between replays.
+    One instance shouldn't be used from more threads at once, use `ParserPool` for that.
+    Body in `body_storage` is emptied by next `parse`, other results are kept.
+    ::
+        >>> parser = ReplayParser(parse_commands={CommandStates.Advance})
+        >>> for data in replays:
+        >>>     result = parser.parse(data)
+    """
+
+    def __init__(self, **kwargs: Any) -> None:
+        """
+        :param kwargs: options of `ReplayReader` and `ReplayBody`, they're same for all parsed replays
+        """
+        self.reader = ReplayReader(**kwargs)
+        self.body_parser = ReplayBody(self.reader, **kwargs)
+
+    def reset(self) -> None:
+        self.body_parser.reset()
+
+    def parse(self, input_data: ACCEPTABLE_DATA_TYPE, parse_body: bool = True) -> Dict[str, Any]:
+        """
+        Parses replay, returns same result as `replay_parser.replay.parse`
+        """
+        self.reset()
+        self.reader.set_data(input_data)
+        result = {
+            "header": ReplayHeader(self.reader).to_dict(),
+            "body_offset": self.reader.offset(),
+        }
+
+        if parse_body:
+            body_parser = self.body_parser
+            body_parser.parse()
+            result["body"] = body_parser.get_body()
+            result["messages"] = body_parser.get_messages()
+            result["desync_ticks"] = body_parser.get_desync_ticks()
+            result["last_tick"] = body_parser.tick
+            result["corrupted_offsets"] = body_parser.get_corrupted_offsets()
+
+        return result
+
+
+class ParserPool:
+    """
+    Thread safe pool of `ReplayParser` objects with same options.
+    Parsers, that were created in parent process, aren't used after fork.
+    ::
+        >>> pool = ParserPool(size=8, parse_commands={CommandStates.Advance})
+        >>> result = pool.parse(data)
+        >>> with pool.acquire() as parser:
+        >>>     result = parser.parse(data, parse_body=False)
+
+    `metrics`, `handlers` and `body_storage` keep state, so they can't be shared by parsers.
+    Use `options_factory`, that creates them for every new parser:
+    ::
+        >>> pool = ParserPool(options_factory=lambda: {"metrics": ParserMetrics()})
+    """
+
+    def __init__(
+            self,
+            size: int = 4,
+            options_factory: Optional[Callable[[], Dict[str, Any]]] = None,
+            **kwargs: Any
+    ) -> None:
+        """
+        :param int size: maximal number of idle parsers kept in pool
+        :param options_factory: returns options for one new `ReplayParser`, they're added to kwargs
+        :param kwargs: options for every `ReplayParser`, except of `metrics`, `handlers` and `body_storage`
+        """
+        shared = PER_PARSER_OPTIONS.intersection(kwargs)
+        if shared:
+            raise ValueError("Options {} can't be shared by parsers, use options_factory".format(
+                ", ".join(sorted(shared))
+            ))
+
+        self.size = max(int(size), 1)
+        self.kwargs = kwargs
+        self.options_factory = options_factory
+        self.lock = Lock()
+        self.pid = os.getpid()
+        self.parsers: LifoQueue = LifoQueue()
+
+    def _create_parser(self) -> ReplayParser:
+        if self.options_factory is None:
+            return ReplayParser(**self.kwargs)
+        return ReplayParser(**dict(self.kwargs, **self.options_factory()))
+
+    def _get_parsers(self) -> LifoQueue:
+        if self.pid != os.getpid():
+            with self.lock:
+                if self.pid != os.getpid():
+                    self.parsers = LifoQueue()
+                    self.pid = os.getpid()
+        return self.parsers
+
+    @contextmanager
+    def acquire(self) -> Iterator[ReplayParser]:
+        parsers = self._get_parsers()
+        try:
+            parser = parsers.get_nowait()
+        except Empty:
+            parser = self._create_parser()
+
+        try:
+            yield parser
+        finally:
+            parsers = self._get_parsers()
+            if parsers.qsize() < self.size:
+                parsers.put(parser)
+
+    def parse(self, input_data: ACCEPTABLE_DATA_TYPE, parse_body: bool = True) -> Dict[str, Any]:
+        with self.acquire() as parser:
+            return parser.parse(input_data, parse_body=parse_body)
@@ -0,0 +1,98 @@
+from array import array
+from struct import Struct
+from typing import Tuple
+
+from replay_parser.constants import CommandStates, TargetType
+from replay_parser.frames import FRAME_HEAD_SIZE, UINT, iter_tick_frames
+from replay_parser.header import ReplayHeader
+from replay_parser.reader import SEEKABLE_DATA_TYPE, ReplayReader
+
+__all__ = ('CommandPositions', 'extract_positions')
+
+VECTOR = Struct("<fff")
+ISSUE_COMMANDS = (CommandStates.IssueCommand, CommandStates.IssueFactoryCommand)
+
+# CmdData from command id to target type: command id, arg1, command type, arg2
+COMMAND_TYPE_OFFSET = 4 + 4
+TARGET_TYPE_OFFSET = COMMAND_TYPE_OFFSET + 1 + 4
+
+
+class CommandPositions:
+    """
+    Column storage of issued target positions.
+    Columns are `array` objects, rows with same index belong to one command.
+    """
+
+    __slots__ = ("x", "y", "z", "tick", "player_id", "action_type", "size", "capacity")
+
+    def __init__(self, capacity: int = 4096) -> None:
+        """
+        :param int capacity: preallocated number of rows, columns double their size when it's not enough
+        """
+        self.capacity = max(int(capacity), 1)
+        self.size = 0
+        self.x = array("f", bytes(4 * self.capacity))
+        self.y = array("f", bytes(4 * self.capacity))
+        self.z = array("f", bytes(4 * self.capacity))
+        self.tick = array("I", bytes(4 * self.capacity))
+        self.player_id = array("B", bytes(self.capacity))
+        self.action_type = array("B", bytes(self.capacity))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def columns(self) -> Tuple[array, ...]:
+        return self.x, self.y, self.z, self.tick, self.player_id, self.action_type
+
+    def append(self, tick: int, player_id: int, action_type: int, x: float, y: float, z: float) -> None:
+        index = self.size
+        if index == self.capacity:
+            for column in self.columns():
+                column.frombytes(bytes(column.itemsize * self.capacity))
+            self.capacity *= 2
+
+        self.x[index] = x
+        self.y[index] = y
+        self.z[index] = z
+        self.tick[index] = tick
+        self.player_id[index] = player_id
+        self.action_type[index] = action_type
+        self.size = index + 1
+
+    def trim(self) -> None:
+        """
+        Drops preallocated rows, which weren't used
+        """
+        for column in self.columns():
+            del column[self.size:]
+        self.capacity = max(self.size, 1)
+
+
+def extract_positions(input_data: SEEKABLE_DATA_TYPE, capacity: int = 4096) -> CommandPositions:
+    """
+    Collects positions of `IssueCommand` and `IssueFactoryCommand` targets directly from command frames.
+    Other commands are skipped by length, only `Advance` and `SetCommandSource` are decoded.
+
+    :param input_data: data source
+    :param int capacity: initial number of rows
+    """
+    reader = ReplayReader(input_data)
+    ReplayHeader(reader)
+    data = reader.get_data()
+
+    positions = CommandPositions(capacity)
+    append = positions.append
+    unpack_uint = UINT.unpack_from
+    unpack_vector = VECTOR.unpack_from
+
+    for tick, player_id, command_type, start, end in iter_tick_frames(data, reader.offset()):
+        if command_type in ISSUE_COMMANDS:
+            start += FRAME_HEAD_SIZE
+            # skip EntIdSet
+            command_start = start + 4 + 4 * unpack_uint(data, start)[0]
+            if data[command_start + TARGET_TYPE_OFFSET] == TargetType.Position:
+                x, y, z = unpack_vector(data, command_start + TARGET_TYPE_OFFSET + 1)
+                append(tick, player_id, data[command_start + COMMAND_TYPE_OFFSET], x, y, z)
+
+    positions.trim()
+    return positions
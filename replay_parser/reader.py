@@ -1,13 +1,96 @@
-from io import SEEK_END, SEEK_SET, BytesIO, FileIO, RawIOBase
+from io import SEEK_CUR, SEEK_END, SEEK_SET, BytesIO, FileIO, RawIOBase
 from struct import unpack
-from typing import Dict, Optional, Union
+from typing import BinaryIO, Dict, Optional, Tuple, Union
 
 from replay_parser.constants import DataType
+from replay_parser.metrics import ParserMetrics
 
-__all__ = ('ReplayReader', 'TYPE_LUA', 'ACCEPTABLE_DATA_TYPE')
+__all__ = ('ReplayReader', 'StreamBuffer', 'TYPE_LUA', 'ACCEPTABLE_DATA_TYPE', 'SEEKABLE_DATA_TYPE')
 
 TYPE_LUA = Union[int, float, str, bool, None, Dict]
-ACCEPTABLE_DATA_TYPE = Union[RawIOBase, FileIO, BytesIO, bytearray, bytes]
+ACCEPTABLE_DATA_TYPE = Union[RawIOBase, FileIO, BytesIO, BinaryIO, bytearray, bytes]
+# data for tools, which need whole replay at once (`ReplayReader.get_data`), streams raise `TypeError` there
+SEEKABLE_DATA_TYPE = Union[RawIOBase, FileIO, BytesIO, bytearray, bytes]
+
+
+class StreamBuffer:
+    """
+    Refillable buffer over readable binary stream, e.g. pipe or download, that can't be copied whole.
+    Only unread data is kept, buffer holds `buffer_size` bytes or one bigger read, so it can't seek back.
+    """
+
+    __slots__ = ("stream", "buffer_size", "data", "position", "start", "metrics")
+
+    def __init__(self, stream: BinaryIO, buffer_size: int = 65536, metrics: ParserMetrics = None) -> None:
+        """
+        :param stream: object with `read(size)` method returning bytes
+        :param int buffer_size: bytes read from stream at once
+        :param ParserMetrics metrics: counts loaded bytes
+        """
+        self.stream = stream
+        self.buffer_size = max(int(buffer_size), 1)
+        self.data = b""
+        self.position = 0
+        self.start = 0  # stream offset of data start
+        self.metrics = metrics
+
+    def fill(self, size: int) -> bool:
+        """
+        Reads stream until `size` bytes after current position are buffered.
+        Returns false, when stream ended before.
+        """
+        if len(self.data) - self.position >= size:
+            return True
+
+        chunks = [self.data[self.position:]]
+        buffered = len(chunks[0])
+        self.start += self.position
+        self.position = 0
+        while buffered < size:
+            chunk = self.stream.read(max(self.buffer_size, size) - buffered)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            buffered += len(chunk)
+            if self.metrics is not None:
+                self.metrics.count_loaded(len(chunk))
+        self.data = b"".join(chunks)
+        return buffered >= size
+
+    def read(self, size: int = 1) -> bytes:
+        self.fill(size)
+        end = self.position + size
+        result = self.data[self.position:end]
+        self.position += len(result)
+        return result
+
+    def tell(self) -> int:
+        return self.start + self.position
+
+    def seek(self, offset: int, whence: int = SEEK_SET) -> int:
+        """
+        Moves forward, skipped data is read from stream and dropped
+        """
+        if whence == SEEK_CUR:
+            offset += self.tell()
+        elif whence != SEEK_SET:
+            raise ValueError("Stream can't seek from its end")
+        if offset < self.start:
+            raise ValueError("Stream can't seek back before offset {}".format(self.start))
+
+        while offset - self.start > len(self.data):
+            self.start += len(self.data)
+            self.position = 0
+            self.data = self.stream.read(min(self.buffer_size, offset - self.start))
+            if not self.data:
+                break
+            if self.metrics is not None:
+                self.metrics.count_loaded(len(self.data))
+        self.position = min(offset - self.start, len(self.data))
+        return self.tell()
+
+    def getvalue(self) -> bytes:
+        raise TypeError("Stream data isn't kept, use bytes or seekable buffer for tools, that need whole replay")
 
 
 class ReplayReader:
@@ -18,10 +101,22 @@ class ReplayReader:
     def __init__(
             self,
             input_data: ACCEPTABLE_DATA_TYPE = b"",
+            metrics: ParserMetrics = None,
+            stream_buffer_size: int = 65536,
             **kwargs
     ) -> None:
-        self.buffer: Optional[BytesIO] = None
+        """
+        :param input_data: io buffer or bytes like object, that ReplayReader would read.
+            Other readable binary streams and unseekable buffers are read through `StreamBuffer`.
+        :param ParserMetrics metrics: counts loaded bytes
+        :param int stream_buffer_size: size of `StreamBuffer` for streams
+        """
+        self.buffer: Optional[Union[BytesIO, StreamBuffer]] = None
         self.buffer_size: Optional[int] = None  # buffer size doesn't change often, it can be cached. I lied
+        self.metrics: Optional[ParserMetrics] = metrics
+        self.stream_buffer_size = stream_buffer_size
+        # raw unit ids to shared tuple of unit ids, filled by commands parsers
+        self.selections: Dict[bytes, Tuple[int, ...]] = {}
         self.set_data(input_data)
 
     def read_string(self) -> str:
@@ -111,16 +206,25 @@ class ReplayReader:
         """
         return self.buffer.read(size)
 
+    def get_data(self) -> bytes:
+        """
+        Returns whole buffer content, it isn't copied when buffer was created from bytes.
+        Raises `TypeError` for streams, they aren't kept in memory.
+        """
+        return self.buffer.getvalue()
+
     def offset(self) -> int:
         """
         Returns internal pointer position
         """
         return self.buffer.tell()
 
-    def size(self) -> int:
+    def size(self) -> Optional[int]:
         """
-        Returns size of buffer
+        Returns size of buffer, `None` for streams
         """
+        if isinstance(self.buffer, StreamBuffer):
+            return None
         if self.buffer_size is None:
             position = self.buffer.tell()
             self.buffer.seek(0, SEEK_END)
@@ -129,6 +233,14 @@ class ReplayReader:
             self.buffer_size = end_position
         return self.buffer_size
 
+    def has_more(self, size: int = 1) -> bool:
+        """
+        Checks, that at least `size` bytes can be read
+        """
+        if isinstance(self.buffer, StreamBuffer):
+            return self.buffer.fill(size)
+        return self.buffer.tell() + size <= self.size()
+
     def seek(self, size: int, seek_type: int = SEEK_SET):
         """
         Moves offset to position in buffer
@@ -142,17 +254,23 @@ class ReplayReader:
         :param input_data: io buffer or bytes like object, that ReplayReader would read.
         """
         self.buffer_size = None
-        if isinstance(input_data, (RawIOBase, BytesIO, FileIO)):
+        if isinstance(input_data, (RawIOBase, BytesIO, FileIO)) and input_data.seekable():
             self.set_data_from_buffer(input_data)
         elif isinstance(input_data, (bytes, bytearray)):
-            if not self.buffer:
+            if not isinstance(self.buffer, BytesIO):
                 self.buffer = BytesIO()
             self.set_data_from_bytes(input_data)
+        elif hasattr(input_data, "read"):
+            self.set_data_from_stream(input_data)
+            return  # stream buffer counts loaded bytes itself
         else:
-            raise ValueError("Unexpected input_data type {}. Use BytesIO, FileIO, bytes or bytearray".format(
+            raise ValueError("Unexpected input_data type {}. Use readable stream, bytes or bytearray".format(
                 type(input_data)
             ))
 
+        if self.metrics is not None:
+            self.metrics.count_loaded(self.size())
+
     def set_data_from_bytes(self, input_data: Union[bytes, bytearray]):
         data_len = len(input_data)
         if data_len != self.buffer_size:
@@ -168,3 +286,7 @@ class ReplayReader:
         input_data.seek(0)
         self.buffer = BytesIO(input_data.read())  # copy data
         input_data.seek(position)
+
+    def set_data_from_stream(self, input_data: BinaryIO):
+        # data is read lazily from current position of stream
+        self.buffer = StreamBuffer(input_data, self.stream_buffer_size, self.metrics)
@@ -1,11 +1,14 @@
+import struct
 from io import RawIOBase
-from typing import Any, Dict, Iterator, Tuple, Union
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
 
 from replay_parser.body import ReplayBody
+from replay_parser.frames import validate_frames
 from replay_parser.header import ReplayHeader
+from replay_parser.pool import ReplayParser
 from replay_parser.reader import ReplayReader
 
-__all__ = ('parse', 'continuous_parse',)
+__all__ = ('parse', 'continuous_parse', 'validate')
 
 
 def parse(
@@ -19,21 +22,7 @@ def parse(
     :param (RawIOBase, bytearray, bytes) input_data: data source
     :param bool parse_body: define what to parse
     """
-    reader = ReplayReader(input_data, **kwargs)
-    result = {
-        "header": ReplayHeader(reader).to_dict(),
-        "body_offset": reader.offset(),
-    }
-
-    if parse_body:
-        body_parser = ReplayBody(reader, **kwargs)
-        body_parser.parse()
-        result["body"] = body_parser.get_body()
-        result["messages"] = body_parser.get_messages()
-        result["desync_ticks"] = body_parser.get_desync_ticks()
-        result["last_tick"] = body_parser.tick
-
-    return result
+    return ReplayParser(**kwargs).parse(input_data, parse_body=parse_body)
 
 
 def continuous_parse(
@@ -60,3 +49,18 @@ def continuous_parse(
 
     for result in ReplayBody(reader, **kwargs).continuous_parse():
         yield result
+
+
+def validate(input_data: Union[RawIOBase, bytearray, bytes]) -> Optional[int]:
+    """
+    Checks header and framing of all commands without decoding of body.
+    Returns offset of first invalid part of replay or `None` for valid replay.
+    Use `parse(input_data, recover=True)` to get commands from broken replay.
+    Streams raise `TypeError`, whole replay is needed.
+    """
+    reader = ReplayReader(input_data)
+    try:
+        ReplayHeader(reader)
+    except (struct.error, ValueError):
+        return reader.offset()
+    return validate_frames(reader.get_data(), reader.offset())
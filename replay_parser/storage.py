@@ -0,0 +1,69 @@
+import marshal
+from collections import deque
+from io import SEEK_END
+from tempfile import TemporaryFile
+from typing import IO, Any, Deque, Dict, Iterator, Optional
+
+__all__ = ('SpillingBodyStorage',)
+
+
+class SpillingBodyStorage:
+    """
+    Storage of `ReplayBody` tick data with bounded memory.
+    Last `memory_ticks` tick data are kept in memory, older ones are written to temporary file.
+    Iteration reads spilled tick data lazily, so whole body is never loaded at once.
+    ::
+        >>> storage = SpillingBodyStorage(memory_ticks=1000)
+        >>> result = parse(data, body_storage=storage)
+        >>> for tick_data in result["body"]: pass
+        >>> storage.close()
+    """
+
+    def __init__(self, memory_ticks: int = 1000, directory: Optional[str] = None) -> None:
+        """
+        :param int memory_ticks: maximal number of tick data in memory
+        :param str directory: directory for temporary file, system default if not set
+        """
+        self.memory_ticks = max(int(memory_ticks), 0)
+        self.directory = directory
+        self.window: Deque[Dict] = deque()
+        self.file: Optional[IO[bytes]] = None
+        self.spilled = 0
+        self.seek_end = False
+
+    def __len__(self) -> int:
+        return self.spilled + len(self.window)
+
+    def append(self, tick_data: Dict[int, Dict[str, Any]]) -> None:
+        self.window.append(tick_data)
+        if len(self.window) > self.memory_ticks:
+            if self.file is None:
+                self.file = TemporaryFile(dir=self.directory)
+            elif self.seek_end:
+                self.file.seek(0, SEEK_END)
+                self.seek_end = False
+            # tick data contain only builtin types, marshal is faster and more compact than pickle
+            marshal.dump(self.window.popleft(), self.file)
+            self.spilled += 1
+
+    def __iter__(self) -> Iterator[Dict[int, Dict[str, Any]]]:
+        """
+        Yields tick data from oldest.
+        Storage shouldn't be appended during iteration and only one iteration can run at once.
+        """
+        if self.file is not None:
+            self.file.seek(0)
+            self.seek_end = True
+            for _ in range(self.spilled):
+                yield marshal.load(self.file)
+        yield from list(self.window)
+
+    def close(self) -> None:
+        """
+        Removes temporary file and drops all data
+        """
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        self.window.clear()
+        self.spilled = 0
@@ -1,5 +1,8 @@
+from sys import intern as intern_string
+from threading import Lock
+from typing import Dict, List, Optional
 
-__all__ = ('units',)
+__all__ = ('units', 'BlueprintRegistry', 'blueprints')
 
 units = {
     "ual0001": "Armored Command Unit",
@@ -382,3 +385,72 @@ units = {
     "xsb5202": "T2 Air Staging Beacon: Iathu-uhthe",
     "xeb2402": "EX Experimental Satellite System: Novax Center"
 }
+
+
+class BlueprintRegistry:
+    """
+    Maps blueprint ids to small integer codes and keeps one interned string per blueprint id.
+    Codes are indexes of blueprint ids in `units` (or `display_names`), so they're same in every process
+    with same table. Unknown blueprint ids (mods, broken commands) don't get code, at most
+    `max_unknown` of them are interned, other ones are returned as they are.
+    ::
+        >>> code = blueprints.code("uel0105")
+        >>> blueprints.name(code)
+        'T1 Engineer'
+    """
+
+    __slots__ = ("codes", "ids", "names", "unknown", "max_unknown", "lock")
+
+    def __init__(self, display_names: Dict[str, str] = None, max_unknown: int = 1024) -> None:
+        """
+        :param dict display_names: blueprint id to unit name, `units` by default
+        :param int max_unknown: number of interned blueprint ids, that aren't in `display_names`
+        """
+        display_names = units if display_names is None else display_names
+        self.ids: List[str] = [intern_string(blueprint_id) for blueprint_id in display_names]
+        self.codes: Dict[str, int] = {blueprint_id: code for code, blueprint_id in enumerate(self.ids)}
+        self.names: List[str] = [display_names[blueprint_id] for blueprint_id in self.ids]
+        self.unknown: Dict[str, str] = {}
+        self.max_unknown = max_unknown
+        self.lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def code(self, blueprint_id: str) -> Optional[int]:
+        """
+        Returns code of blueprint id, `None` for unknown blueprint id
+        """
+        return self.codes.get(blueprint_id)
+
+    def intern(self, blueprint_id: str) -> str:
+        """
+        Returns shared string of blueprint id
+        """
+        code = self.codes.get(blueprint_id)
+        if code is not None:
+            return self.ids[code]
+
+        shared = self.unknown.get(blueprint_id)
+        if shared is None:
+            if not blueprint_id:
+                return blueprint_id
+            with self.lock:
+                shared = self.unknown.get(blueprint_id)
+                if shared is None:
+                    if len(self.unknown) >= self.max_unknown:
+                        return blueprint_id
+                    shared = self.unknown[blueprint_id] = blueprint_id
+        return shared
+
+    def blueprint_id(self, code: int) -> str:
+        return self.ids[code]
+
+    def name(self, code: int) -> str:
+        """
+        Returns unit name of blueprint code
+        """
+        return self.names[code]
+
+
+blueprints = BlueprintRegistry()
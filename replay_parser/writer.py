@@ -0,0 +1,133 @@
+import struct
+from typing import BinaryIO, Container, Iterable, List, Optional, Tuple
+
+from replay_parser.constants import CommandStates
+from replay_parser.exception import InvalidReplay
+from replay_parser.frames import FRAME_HEAD_SIZE, iter_frames, iter_tick_frames
+from replay_parser.header import ReplayHeader
+from replay_parser.messages import MESSAGE_CALLBACK, chat_message
+from replay_parser.reader import SEEKABLE_DATA_TYPE, ReplayReader
+
+__all__ = ('write_filtered', 'trim_replay')
+
+ADVANCE_FRAME = struct.Struct("<BHI")
+
+# commands, which keep ticks and players of other commands
+REQUIRED_COMMANDS = frozenset((CommandStates.Advance, CommandStates.SetCommandSource))
+
+
+def write_filtered(
+        input_data: SEEKABLE_DATA_TYPE,
+        output: BinaryIO,
+        drop_commands: Container[int] = (),
+        drop_callbacks: Iterable[str] = (),
+        drop_messages: bool = False,
+) -> int:
+    """
+    Writes copy of replay without some commands. Header and kept commands are copied as memoryview slices,
+    consecutive kept commands are written at once.
+
+    :param input_data: data source
+    :param output: binary stream for new replay
+    :param drop_commands: ids of removed commands, `Advance` and `SetCommandSource` can't be removed
+    :param drop_callbacks: names of removed `LuaSimCallback` commands
+    :param bool drop_messages: removes players chat messages, other resource transfers are kept
+    :return: number of removed commands
+    """
+    if any(command_type in drop_commands for command_type in REQUIRED_COMMANDS):
+        raise ValueError("Advance and SetCommandSource commands are required in replay")
+
+    reader = ReplayReader(input_data)
+    ReplayHeader(reader)
+    data = memoryview(reader.get_data())
+    command_reader = ReplayReader()
+    callback_names = tuple(name.encode() + b"\x00" for name in drop_callbacks)
+    filter_callbacks = bool(callback_names) or drop_messages
+
+    dropped = 0
+    kept_start = 0
+    for command_type, start, end in iter_frames(data, reader.offset()):
+        if command_type in drop_commands:
+            drop = True
+        elif command_type == CommandStates.LuaSimCallback and filter_callbacks:
+            callback = data[start + FRAME_HEAD_SIZE:end]
+            drop = any(callback[:len(name)] == name for name in callback_names)
+            if not drop and drop_messages and callback[:len(MESSAGE_CALLBACK)] == MESSAGE_CALLBACK:
+                command_reader.set_data_from_bytes(callback[len(MESSAGE_CALLBACK):])
+                try:
+                    drop = chat_message(command_reader.read_lua()) is not None
+                except (struct.error, ValueError) as e:
+                    raise InvalidReplay("Can't parse chat message at offset {}: {}".format(start, e)) from e
+        else:
+            continue
+
+        if drop:
+            output.write(data[kept_start:start])
+            kept_start = end
+            dropped += 1
+
+    output.write(data[kept_start:])
+    return dropped
+
+
+def trim_replay(
+        input_data: SEEKABLE_DATA_TYPE,
+        output: BinaryIO,
+        start_tick: int = 0,
+        end_tick: Optional[int] = None,
+) -> int:
+    """
+    Writes replay with commands from `start_tick` to `end_tick` (same range as `ReplayBody` uses).
+    Range is found by scan of frames and copied as one slice.
+
+    Before the range new replay gets source switches and terminations of players, that left before
+    `start_tick`, and one `Advance` of skipped ticks, so ticks of commands don't change.
+
+    :param input_data: data source
+    :param output: binary stream for new replay
+    :param int start_tick: first tick of new replay
+    :param int end_tick: last tick of new replay, till end when not set
+    :return: last tick of new replay
+    """
+    reader = ReplayReader(input_data)
+    ReplayHeader(reader)
+    data = memoryview(reader.get_data())
+    body_offset = reader.offset()
+
+    last_tick = 0
+    skipped_ticks = 0
+    range_start = body_offset if start_tick <= 0 else None
+    range_end = len(data)
+    source_frame: Optional[memoryview] = None
+    terminated: List[Tuple[Optional[memoryview], memoryview]] = []
+
+    for tick, _, command_type, start, end in iter_tick_frames(data, body_offset):
+        if command_type == CommandStates.Advance:
+            if range_start is None and tick >= start_tick:
+                range_start = start
+                skipped_ticks = last_tick
+            if end_tick is not None and tick > end_tick:
+                range_end = start
+                break
+            last_tick = tick
+
+        elif range_start is None:
+            if command_type == CommandStates.SetCommandSource:
+                source_frame = data[start:end]
+            elif command_type == CommandStates.CommandSourceTerminated:
+                terminated.append((source_frame, data[start:end]))
+
+    output.write(data[:body_offset])
+    if range_start != body_offset:
+        for terminated_source_frame, terminated_frame in terminated:
+            if terminated_source_frame is not None:
+                output.write(terminated_source_frame)
+            output.write(terminated_frame)
+        if skipped_ticks:
+            output.write(ADVANCE_FRAME.pack(CommandStates.Advance, ADVANCE_FRAME.size, skipped_ticks))
+        if source_frame is not None:
+            output.write(source_frame)
+
+    if range_start is not None and range_start < range_end:
+        output.write(data[range_start:range_end])
+    return last_tick
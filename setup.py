@@ -7,4 +7,7 @@ setup(
     author='Kalinovsky Konstantin',
     author_email='norraxx@gmail.com',
     packages=['replay_parser'],
+    extras_require={
+        'arrow': ['pyarrow'],
+    },
 )
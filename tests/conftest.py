@@ -4,3 +4,12 @@ import sys
 from .fixtures.replay_fixtures import *
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "replay_parser")))
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--update-golden",
+        action="store_true",
+        default=False,
+        help="rewrite golden outputs in tests/fixtures/golden from current parser output",
+    )
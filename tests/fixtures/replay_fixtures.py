@@ -1,11 +1,18 @@
+import json
 import os
+from functools import lru_cache
 from io import BytesIO, FileIO
 
 import pytest
 
-__all__ = ('replays', 'replay_file_name')
+from replay_parser.export import ReplayJSONEncoder
+from replay_parser.metrics import ParserMetrics
+from replay_parser.replay import parse
+
+__all__ = ('replays', 'replay_file_name', 'replay_data', 'golden_output', 'load_replay', 'replay_summary')
 
 REPLAYS_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "replays")
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "golden")
 
 
 def get_replay_file_name():
@@ -14,11 +21,41 @@ def get_replay_file_name():
     """
     return [
         os.path.abspath(os.path.join(REPLAYS_DIR, file_name))
-        for file_name in os.listdir(REPLAYS_DIR)
+        for file_name in sorted(os.listdir(REPLAYS_DIR))
         if file_name.endswith(".scfareplay")
     ]
 
 
+@lru_cache(maxsize=None)
+def load_replay(file_name):
+    """
+    Reads replay file once per session, returned bytes are shared between tests
+    """
+    with open(file_name, "rb") as f:
+        return f.read()
+
+
+def replay_summary(replay_data):
+    """
+    Parses whole replay and returns json compatible result, that is compared with golden output
+    """
+    metrics = ParserMetrics(sample_rate=0)
+    data = parse(replay_data, metrics=metrics)
+    header = data["header"]
+    summary = {
+        "header": {
+            key: header[key]
+            for key in ("version", "replay_version", "map_name", "players", "cheats_enabled", "random_seed")
+        },
+        "body_offset": data["body_offset"],
+        "last_tick": data["last_tick"],
+        "desync_ticks": data["desync_ticks"],
+        "messages": data["messages"],
+        "commands": {name: row["count"] for name, row in metrics.to_dict()["commands"].items()},
+    }
+    return json.loads(ReplayJSONEncoder().encode(summary))
+
+
 @pytest.fixture(params=get_replay_file_name())
 def replay_file_name(request):
     """
@@ -27,11 +64,37 @@ def replay_file_name(request):
     return request.param
 
 
+@pytest.fixture
+def replay_data(replay_file_name):
+    """
+    Returns cached content of replay file
+    """
+    return load_replay(replay_file_name)
+
+
 @pytest.fixture(params=[BytesIO, bytearray, bytes, FileIO])
 def replays(request, replay_file_name):
     output_type = request.param
     if issubclass(output_type, FileIO):
         return FileIO(replay_file_name, "rb")
 
-    with open(replay_file_name, "rb") as f:
-        return output_type(f.read())
+    data = load_replay(replay_file_name)
+    if output_type is bytes:
+        return data
+    return output_type(data)
+
+
+@pytest.fixture
+def golden_output(request, replay_file_name):
+    """
+    Returns stored summary of replay, `--update-golden` rewrites it from current parser output
+    """
+    golden_file_name = os.path.join(GOLDEN_DIR, os.path.basename(replay_file_name) + ".json")
+    if request.config.getoption("update_golden"):
+        os.makedirs(GOLDEN_DIR, exist_ok=True)
+        with open(golden_file_name, "w") as f:
+            json.dump(replay_summary(load_replay(replay_file_name)), f, indent=1, sort_keys=True)
+            f.write("\n")
+
+    with open(golden_file_name) as f:
+        return json.load(f)
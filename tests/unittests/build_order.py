@@ -0,0 +1,21 @@
+from replay_parser.build_order import BUILD_ACTIONS, extract_build_order
+from replay_parser.constants import CommandStates
+from replay_parser.replay import parse
+
+
+def test_build_order(replay_data):
+    expected = {}
+
+    def collect(tick, player_id, command):
+        cmd_data = command["cmd_data"]
+        if cmd_data["command_type"] in BUILD_ACTIONS:
+            expected.setdefault(player_id, []).append((tick, cmd_data["blueprint_id"], cmd_data["command_type"]))
+
+    parse(replay_data, handlers={CommandStates.IssueCommand: collect, CommandStates.IssueFactoryCommand: collect})
+
+    build_order = extract_build_order(replay_data)
+    assert {player_id: builds for player_id, builds in build_order.items() if builds} == expected
+
+    limited = extract_build_order(replay_data, limit=3, end_tick=3000)
+    for player_id, builds in limited.items():
+        assert builds == [row for row in expected.get(player_id, []) if row[0] <= 3000][:3]
@@ -0,0 +1,31 @@
+import pytest
+
+from replay_parser.columnar import iter_record_batches, write_parquet
+from replay_parser.constants import CommandStates
+from replay_parser.metrics import ParserMetrics
+
+pyarrow = pytest.importorskip("pyarrow")
+pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+
+
+def test_record_batches(replay_data):
+    metrics = ParserMetrics(sample_rate=0)
+    rows = {}
+    for name, batch in iter_record_batches(replay_data, batch_size=100, metrics=metrics):
+        assert batch.num_rows <= 100
+        rows[name] = rows.get(name, 0) + batch.num_rows
+
+    counts = metrics.commands_count
+    assert rows.get("issue", 0) == counts[CommandStates.IssueCommand] + counts[CommandStates.IssueFactoryCommand]
+    assert rows.get("create_unit", 0) == counts[CommandStates.CreateUnit]
+    assert rows.get("checksum", 0) == counts[CommandStates.VerifyChecksum]
+    assert rows.get("lua_sim_callback", 0) == counts[CommandStates.LuaSimCallback]
+
+
+def test_write_parquet(replay_data, tmpdir):
+    rows = write_parquet(replay_data, str(tmpdir), replay_id=42, batch_size=1000)
+
+    dataset = pyarrow_parquet.ParquetDataset(str(tmpdir.join("checksum")))
+    table = dataset.read()
+    assert table.num_rows == rows["checksum"]
+    assert set(table.column("replay_id").to_pylist()) <= {42}
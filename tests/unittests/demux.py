@@ -0,0 +1,26 @@
+from replay_parser.commands import COMMAND_PARSERS
+from replay_parser.constants import CommandStates
+from replay_parser.demux import PlayerStreamIndex
+from replay_parser.replay import parse
+
+PLAYER_COMMANDS = set(COMMAND_PARSERS) - {CommandStates.Advance, CommandStates.SetCommandSource}
+
+
+def test_player_stream_index(replay_data):
+    expected = {}
+
+    def collect(command_type):
+        def handler(tick, player_id, command):
+            expected.setdefault(player_id, []).append((tick, command_type, command))
+        return handler
+
+    parse(replay_data, handlers={command_type: collect(command_type) for command_type in PLAYER_COMMANDS})
+    index = PlayerStreamIndex(replay_data)
+
+    assert set(expected) <= set(index.players())
+    for player_id in index.players():
+        assert list(index.iter_commands(player_id)) == expected.get(player_id, [])
+
+    player_id = index.players()[0]
+    checksums = list(index.iter_commands(player_id, {CommandStates.VerifyChecksum}))
+    assert checksums == [row for row in expected.get(player_id, []) if row[1] == CommandStates.VerifyChecksum]
@@ -0,0 +1,67 @@
+import os
+import struct
+from io import BytesIO
+
+from replay_parser.constants import CommandStates
+from replay_parser.desync import compare_replays
+from replay_parser.frames import iter_tick_frames
+from replay_parser.replay import parse
+from replay_parser.writer import trim_replay
+from tests.fixtures.replay_fixtures import REPLAYS_DIR, load_replay
+
+
+def replay(file_name):
+    return load_replay(os.path.join(REPLAYS_DIR, file_name))
+
+
+def test_same_replays_dont_diverge():
+    assert compare_replays(replay("8805603.scfareplay"), replay("8805603.scfareplay")) is None
+
+
+def test_replays_of_one_game_diverge_at_end():
+    divergence = compare_replays(replay("8604509.scfareplay"), replay("8604509-EcoNoob.scfareplay"))
+    assert divergence.tick == 19125
+    assert divergence.reason == "command"
+
+    first, second = divergence.commands()
+    assert first["command"] == "SetCommandSource"
+    assert second["command"] == "CommandSourceTerminated"
+
+
+def test_desync_inside_replay():
+    divergence = compare_replays(replay("8748707-dragonite.scfareplay"))
+    assert divergence.tick == 9105
+    assert divergence.reason == "desync"
+    assert divergence.frames[0][1] == CommandStates.VerifyChecksum
+    assert divergence.to_dict()["commands"][0]["command"] == "VerifyChecksum"
+
+
+def test_replays_diverge_at_different_ticks():
+    original = replay("8805564.scfareplay")
+    body_offset = parse(original, parse_body=False)["body_offset"]
+    tick, start = next(
+        (tick, start) for tick, _, command_type, start, _ in iter_tick_frames(original, body_offset)
+        if command_type == CommandStates.Advance and tick > 0
+    )
+    shifted = bytearray(original)
+    struct.pack_into("<I", shifted, start + 3, tick + 1)
+
+    divergence = compare_replays(original, shifted)
+    assert divergence.tick == tick
+    assert divergence.reason == "tick"
+    assert divergence.frames[0] is not None and divergence.frames[1] is None
+
+    trimmed = BytesIO()
+    trim_replay(original, trimmed, 500)
+    assert compare_replays(original, trimmed.getvalue()).reason != "end"
+
+
+def test_replay_ends_earlier():
+    original = replay("8805564.scfareplay")
+    trimmed = BytesIO()
+    last_tick = trim_replay(original, trimmed, 0, 500)
+
+    divergence = compare_replays(original, trimmed.getvalue())
+    assert divergence.reason == "end"
+    assert divergence.tick > last_tick
+    assert divergence.frames[1] is None
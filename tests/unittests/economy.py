@@ -0,0 +1,51 @@
+import struct
+from array import array
+
+import pytest
+
+from replay_parser.constants import CommandStates
+from replay_parser.economy import aggregate_economy
+from replay_parser.exception import InvalidReplay
+from replay_parser.replay import parse
+
+
+def test_aggregate_economy(replay_data):
+    expected_transfers = {}
+    expected_callbacks = {}
+
+    def collect(tick, player_id, command):
+        lua_name, lua = command["lua_name"], command["lua"]
+        expected_callbacks.setdefault(lua_name, {}).setdefault(player_id, array("I")).append(tick)
+        if lua_name == "GiveResourcesToPlayer" and "Msg" not in lua:
+            expected_transfers.setdefault(player_id, []).append((tick, lua["To"], lua["Mass"], lua["Energy"]))
+
+    parse(replay_data, handlers={CommandStates.LuaSimCallback: collect})
+    result = aggregate_economy(replay_data, callbacks=expected_callbacks)
+
+    assert result.callbacks == expected_callbacks
+    assert set(result.transfers) == set(expected_transfers)
+    for player_id, transfers in result.transfers.items():
+        assert list(zip(transfers.tick, transfers.to_army, transfers.mass, transfers.energy)) == [
+            (tick, to_army, array("f", [mass])[0], array("f", [energy])[0])
+            for tick, to_army, mass, energy in expected_transfers[player_id]
+        ]
+
+
+def test_aggregate_selected_callbacks(replay_data):
+    result = aggregate_economy(replay_data, callbacks=["CapMex"])
+    assert set(result.callbacks) <= {"CapMex"}
+    assert not result.transfers
+
+
+@pytest.mark.parametrize("payload", [
+    b"GiveResourcesToPlayer",
+    b"GiveResourcesToPlayer\x00\x04\x01Mass\x00",
+    b"GiveResourcesToPlayer\x00\x04\x01Mass\x00\x01lots\x00\x05",
+    b"GiveResourcesToPlayer\x00\x04\x01To\x00\x00" + struct.pack("<f", 1000.0) + b"\x05",
+])
+def test_aggregate_malformed_callback(replay_data, payload):
+    body_offset = parse(replay_data, parse_body=False)["body_offset"]
+    frame = struct.pack("<BH", CommandStates.LuaSimCallback, len(payload) + 3) + payload
+
+    with pytest.raises(InvalidReplay):
+        aggregate_economy(replay_data[:body_offset] + frame)
@@ -0,0 +1,53 @@
+import json
+from io import StringIO
+
+import pytest
+
+from replay_parser.constants import CommandStates
+from replay_parser.export import ReplayJSONEncoder, write_ndjson
+from replay_parser.metrics import ParserMetrics
+from replay_parser.replay import continuous_parse
+
+
+def test_write_ndjson(replay_data):
+    output = StringIO()
+    metrics = ParserMetrics(sample_rate=0)
+    written = write_ndjson(replay_data, output, metrics=metrics)
+
+    lines = output.getvalue().splitlines()
+    header = json.loads(lines[0])
+    commands = [json.loads(line) for line in lines[1:]]
+
+    assert "header" in header and "body_offset" in header
+    assert written == len(commands) == metrics.commands_read
+    for command in commands:
+        if command["command"] == "LuaSimCallback":
+            assert isinstance(bytes.fromhex(command["data"]["data"]), bytes)
+
+    ticks = [tick for tick, command_type, _ in list(continuous_parse(replay_data, parse_header=True))[1:]
+             if command_type == CommandStates.VerifyChecksum]
+    assert [command["tick"] for command in commands if command["command"] == "VerifyChecksum"] == ticks
+
+
+def test_write_ndjson_selected_fields(replay_data):
+    output = StringIO()
+    write_ndjson(
+        replay_data,
+        output,
+        fields={CommandStates.CreateUnit: ["blueprint_id"], CommandStates.LuaSimCallback: None},
+        bytes_encoding="base64",
+        write_header=False,
+    )
+    for line in output.getvalue().splitlines():
+        command = json.loads(line)
+        if command["command"] == "CreateUnit":
+            assert set(command) == {"tick", "player_id", "command", "data"}
+            assert set(command["data"]) == {"blueprint_id"}
+        else:
+            assert command["command"] == "LuaSimCallback"
+            assert "lua_name" in command["data"]
+
+
+def test_unknown_bytes_encoding():
+    with pytest.raises(ValueError):
+        ReplayJSONEncoder(bytes_encoding="ascii85")
@@ -0,0 +1,29 @@
+from threading import Thread
+
+from replay_parser.follow import complete_frames_end, follow
+from replay_parser.replay import continuous_parse
+
+
+def write_in_chunks(path, data, chunk_size):
+    with open(path, "ab") as replay_file:
+        for offset in range(0, len(data), chunk_size):
+            replay_file.write(data[offset:offset + chunk_size])
+            replay_file.flush()
+
+
+def test_follow_growing_replay(replay_data, tmp_path):
+    path = tmp_path / "live.scfareplay"
+    path.write_bytes(b"")
+    writer = Thread(target=write_in_chunks, args=(path, replay_data, 997))
+    writer.start()
+
+    followed = list(follow(str(path), poll_interval=0.001, idle_timeout=1))
+    writer.join()
+    assert followed == list(continuous_parse(replay_data, parse_header=True))
+
+
+def test_complete_frames_end():
+    frames = b"\x00\x07\x00\x01\x00\x00\x00" + b"\x01\x04\x00\x02"
+    assert complete_frames_end(bytearray(frames)) == len(frames)
+    assert complete_frames_end(bytearray(frames[:-1])) == 7
+    assert complete_frames_end(bytearray(frames[:2])) == 0
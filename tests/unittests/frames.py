@@ -0,0 +1,102 @@
+import os
+import random
+from io import BytesIO
+
+import pytest
+
+from replay_parser.constants import CommandStates
+from replay_parser.demux import PlayerStreamIndex
+from replay_parser.economy import aggregate_economy
+from replay_parser.exception import InvalidReplay
+from replay_parser.frames import find_next_frame, iter_frames, iter_tick_frames, validate_frames
+from replay_parser.messages import extract_messages
+from replay_parser.positions import extract_positions
+from replay_parser.replay import continuous_parse, parse, validate
+from replay_parser.writer import write_filtered
+from tests.fixtures.replay_fixtures import REPLAYS_DIR, load_replay
+
+
+def test_valid_replay(replay_data):
+    assert validate(replay_data) is None
+
+
+def test_truncated_replay(replay_data):
+    body_offset = parse(replay_data, parse_body=False)["body_offset"]
+    frames = list(iter_frames(replay_data, body_offset))
+    _, last_start, last_end = frames[-1]
+
+    truncated = replay_data[:last_end - 1]
+    assert validate(truncated) == last_start
+    assert validate_frames(truncated, body_offset) == last_start
+    with pytest.raises(InvalidReplay):
+        parse(truncated)
+
+    data = parse(truncated, recover=True)
+    assert data["corrupted_offsets"] == [last_start]
+    assert validate(replay_data[:body_offset - 10]) is not None
+
+
+def test_corrupted_frame_recovery(replay_data):
+    expected = parse(replay_data)
+    frames = [frame for frame in iter_frames(replay_data, expected["body_offset"]) if frame[0] != CommandStates.Advance]
+    _, corrupted_start, corrupted_end = frames[len(frames) // 2]
+
+    corrupted = bytearray(replay_data)
+    corrupted[corrupted_start] = 0xff
+    assert validate(corrupted) == corrupted_start
+    assert find_next_frame(corrupted, corrupted_end) == corrupted_end
+    with pytest.raises(InvalidReplay):
+        parse(corrupted)
+
+    data = parse(corrupted, recover=True)
+    assert data["corrupted_offsets"] == [corrupted_start]
+    assert data["last_tick"] == expected["last_tick"]
+
+
+@pytest.mark.parametrize("extractor", [
+    extract_messages,
+    extract_positions,
+    aggregate_economy,
+    PlayerStreamIndex,
+    lambda data: write_filtered(data, BytesIO()),
+])
+def test_frame_extractors_reject_zero_frame_length(replay_data, extractor):
+    body_offset = parse(replay_data, parse_body=False)["body_offset"]
+    frames = list(iter_frames(replay_data, body_offset))
+    _, corrupted_start, _ = frames[len(frames) // 2]
+
+    corrupted = bytearray(replay_data)
+    corrupted[corrupted_start + 1:corrupted_start + 3] = b"\x00\x00"
+    with pytest.raises(InvalidReplay):
+        extractor(corrupted)
+    assert parse(corrupted, recover=True)["corrupted_offsets"][0] == corrupted_start
+
+
+def test_iter_frames_truncated_data(replay_data):
+    body_offset = parse(replay_data, parse_body=False)["body_offset"]
+    with pytest.raises(InvalidReplay):
+        list(iter_frames(replay_data[:-1], body_offset))
+    with pytest.raises(InvalidReplay):
+        list(iter_frames(replay_data + b"\x00", body_offset))
+
+
+def test_recover_random_corruption():
+    replay_data = load_replay(os.path.join(REPLAYS_DIR, "8805564.scfareplay"))
+    body_offset = parse(replay_data, parse_body=False)["body_offset"]
+    rng = random.Random(6)
+    for _ in range(300):
+        corrupted = bytearray(replay_data)
+        for _ in range(20):
+            corrupted[rng.randrange(body_offset, len(corrupted))] = rng.randrange(256)
+        parse(corrupted, recover=True)
+
+
+def test_iter_tick_frames(replay_data):
+    commands = list(continuous_parse(replay_data, parse_header=True))
+    frames = list(iter_tick_frames(replay_data, commands[0]["body_offset"]))
+    assert [(tick, command_type) for tick, _, command_type, _, _ in frames] == \
+        [(tick, command_type) for tick, command_type, _ in commands[1:]]
+
+    sources = [(player_id, replay_data[start + 3]) for _, player_id, command_type, start, _ in frames
+               if command_type == CommandStates.SetCommandSource]
+    assert all(player_id == source for player_id, source in sources)
@@ -0,0 +1,127 @@
+import pytest
+
+from replay_parser.body import ReplayBody
+from replay_parser.constants import ActionType, CommandStateNames, CommandStates
+from replay_parser.header import ReplayHeader
+from replay_parser.metrics import ParserMetrics
+from replay_parser.reader import ReplayReader
+from replay_parser.replay import parse
+
+
+def test_handlers_get_only_registered_commands(replay_data):
+    created_units = []
+    metrics = ParserMetrics(sample_rate=0)
+    data = parse(
+        replay_data,
+        metrics=metrics,
+        handlers={
+            CommandStates.CreateUnit: lambda tick, player_id, command: created_units.append(
+                (tick, player_id, command["blueprint_id"])
+            )
+        },
+    )
+
+    parsed = {
+        CommandStateNames.index(name)
+        for name, row in metrics.to_dict()["commands"].items()
+        if row["parsed"]
+    }
+    assert parsed <= {
+        CommandStates.Advance,
+        CommandStates.SetCommandSource,
+        CommandStates.CreateUnit,
+        CommandStates.VerifyChecksum,
+        CommandStates.LuaSimCallback,
+    }
+    assert len(created_units) == metrics.commands_parsed[CommandStates.CreateUnit]
+    assert all(0 <= tick <= data["last_tick"] for tick, _, _ in created_units)
+
+    expected = parse(replay_data)
+    assert data["desync_ticks"] == expected["desync_ticks"]
+    assert data["messages"] == expected["messages"]
+    callbacks = CommandStates.LuaSimCallback
+    assert metrics.commands_parsed[callbacks] <= metrics.commands_count[callbacks]
+
+
+def test_handler_sees_same_commands_as_body(replay_data):
+    stored = parse(replay_data, store_body=True)["body"]
+    expected = sum(1 for tick_data in stored for commands in tick_data.values() if "IssueCommand" in commands)
+
+    issued = []
+    reader = ReplayReader(replay_data)
+    ReplayHeader(reader)
+    body = ReplayBody(reader)
+    body.register_handler(CommandStates.IssueCommand, lambda *args: issued.append(args))
+    body.parse()
+
+    # stored body keeps only last command of type per player and tick
+    assert len(issued) >= expected
+    assert all(command["type"] == "issue" for _, _, command in issued)
+
+
+def test_register_unknown_handler():
+    with pytest.raises(ValueError):
+        ReplayBody(ReplayReader()).register_handler(100, print)
+
+
+def test_filters_skip_commands_before_parsing(replay_data):
+    issued = []
+    parse(replay_data, handlers={CommandStates.IssueCommand: lambda *args: issued.append(args)})
+    actions = {ActionType.Attack, ActionType.Reclaim}
+    expected = [row for row in issued if row[2]["cmd_data"]["command_type"] in actions]
+
+    filtered = []
+    metrics = ParserMetrics(sample_rate=0)
+    parse(
+        replay_data,
+        metrics=metrics,
+        handlers={CommandStates.IssueCommand: lambda *args: filtered.append(args)},
+        command_filters={CommandStates.IssueCommand: lambda fields: fields["command_type"] in actions},
+    )
+    assert [row[:2] for row in filtered] == [row[:2] for row in expected]
+    assert [row[2]["cmd_data"] for row in filtered] == [row[2]["cmd_data"] for row in expected]
+    assert metrics.commands_parsed[CommandStates.IssueCommand] == len(expected)
+
+
+def test_filter_by_peeked_fields(replay_data):
+    created_units = []
+    callbacks = []
+    parse(replay_data, handlers={
+        CommandStates.CreateUnit: lambda tick, player_id, command: created_units.append(command),
+        CommandStates.LuaSimCallback: lambda tick, player_id, command: callbacks.append(command),
+    })
+    blueprint_ids = {command["blueprint_id"] for command in created_units[:1]}
+
+    peeked = []
+
+    def keep(fields):
+        peeked.append(fields)
+        return fields.get("blueprint_id") in blueprint_ids or fields.get("lua_name") == "GiveResourcesToPlayer"
+
+    data = parse(replay_data, store_body=True, command_filters={
+        CommandStates.CreateUnit: keep,
+        CommandStates.LuaSimCallback: keep,
+    })
+    assert len(peeked) == len(created_units) + len(callbacks)
+    assert [fields["blueprint_id"] for fields in peeked if "blueprint_id" in fields] == \
+        [command["blueprint_id"] for command in created_units]
+    assert data["messages"] == parse(replay_data)["messages"]
+
+    for tick_data in data["body"]:
+        for commands in tick_data.values():
+            if "CreateUnit" in commands:
+                assert commands["CreateUnit"]["blueprint_id"] in blueprint_ids
+            if "LuaSimCallback" in commands:
+                assert commands["LuaSimCallback"]["lua_name"] == "GiveResourcesToPlayer"
+
+
+def test_filters_keep_other_commands(replay_data):
+    expected = parse(replay_data)
+    data = parse(replay_data, command_filters={CommandStates.IssueCommand: lambda fields: False})
+    assert data["desync_ticks"] == expected["desync_ticks"]
+    assert data["messages"] == expected["messages"]
+
+
+def test_register_unsupported_filter():
+    with pytest.raises(ValueError):
+        ReplayBody(ReplayReader()).register_filter(CommandStates.Advance, bool)
@@ -0,0 +1,37 @@
+import json
+import pickle
+
+import pytest
+
+from replay_parser.header import FrozenDict, LuaBlobCache, ReplayHeader
+from replay_parser.reader import ReplayReader
+
+
+def test_header_blobs_are_shared(replay_data):
+    header = ReplayHeader(ReplayReader(replay_data))
+    other_header = ReplayHeader(ReplayReader(replay_data))
+
+    assert isinstance(header.scenario, FrozenDict)
+    assert other_header.scenario is header.scenario
+    assert other_header.mods is header.mods
+    assert json.dumps(header.scenario) == json.dumps(dict(header.scenario))
+
+    with pytest.raises(TypeError):
+        header.scenario["name"] = "changed"
+    with pytest.raises(TypeError):
+        header.scenario.clear()
+    assert pickle.loads(pickle.dumps(header.scenario)) == header.scenario
+
+
+def test_lua_blob_cache_evicts_least_recently_used():
+    cache = LuaBlobCache(maxsize=2)
+    blobs = [b"\x04\x01name\x00\x01" + str(i).encode() + b"\x00\x05" for i in range(3)]
+    first = cache.decode(blobs[0])
+    assert first == {"name": "0"}
+    cache.decode(blobs[1])
+    assert cache.decode(blobs[0]) is first
+    cache.decode(blobs[2])
+
+    assert len(cache) == 2
+    assert cache.decode(blobs[0]) is first
+    assert cache.misses == 3
@@ -0,0 +1,49 @@
+import os
+import shutil
+
+from replay_parser.index import ReplayIndex, main
+from tests.fixtures.replay_fixtures import REPLAYS_DIR
+
+
+def test_replay_index(tmpdir):
+    replays_dir = tmpdir.mkdir("replays")
+    for file_name in ("8748707-dragonite.scfareplay", "8805603.scfareplay", "8805598.scfareplay"):
+        shutil.copy(os.path.join(REPLAYS_DIR, file_name), str(replays_dir))
+    replays_dir.join("broken.scfareplay").write_binary(b"\x00" * 10)
+
+    index = ReplayIndex(str(tmpdir.join("index.sqlite")), batch_size=2)
+    assert index.update(str(replays_dir)) == {"indexed": 3, "unchanged": 0, "removed": 0, "invalid": 1}
+
+    dragonite = str(replays_dir.join("8748707-dragonite.scfareplay"))
+    assert index.find(player_name="dragonite") == [dragonite]
+    assert index.find(player_name="coca") == [str(replays_dir.join("8805603.scfareplay"))]
+    assert index.find(map_name="no map", player_name="dragonite") == []
+    assert len(index.find()) == 3
+
+    desynced, = index.connection.execute("SELECT desynced, first_desync_tick FROM replays WHERE path = ?", (dragonite,))
+    assert desynced == (1, 9105)
+    factions = dict(index.connection.execute(
+        "SELECT player_name, faction FROM armies WHERE replay_path = ?", (dragonite,)
+    ))
+    assert factions["dragonite"] == 3
+
+    replays_dir.join("8805598.scfareplay").remove()
+    assert index.update(str(replays_dir)) == {"indexed": 0, "unchanged": 2, "removed": 1, "invalid": 1}
+    assert [path for path, in index.connection.execute("SELECT path FROM invalid_replays")] == [
+        str(replays_dir.join("broken.scfareplay"))
+    ]
+
+    replays_dir.join("8748707-dragonite.scfareplay").write_binary(b"\x00" * 10)
+    assert index.update(str(replays_dir)) == {"indexed": 0, "unchanged": 1, "removed": 0, "invalid": 2}
+    assert index.find(player_name="dragonite") == []
+    assert not list(index.connection.execute("SELECT * FROM armies WHERE replay_path = ?", (dragonite,)))
+
+    replays_dir.join("broken.scfareplay").remove()
+    assert index.update(str(replays_dir)) == {"indexed": 0, "unchanged": 1, "removed": 0, "invalid": 1}
+    assert [path for path, in index.connection.execute("SELECT path FROM invalid_replays")] == [dragonite]
+    index.close()
+
+
+def test_replay_index_command(tmpdir, capsys):
+    main([REPLAYS_DIR, str(tmpdir.join("index.sqlite"))])
+    assert "'indexed': 11" in capsys.readouterr().out
@@ -0,0 +1,30 @@
+from collections import Counter
+
+from replay_parser.constants import CommandStates
+from replay_parser.lifecycle import iter_lifecycles
+from replay_parser.metrics import ParserMetrics
+
+
+def test_lifecycles(replay_data):
+    metrics = ParserMetrics(sample_rate=0)
+    lifecycles = list(iter_lifecycles(replay_data, metrics=metrics))
+
+    commands_count = metrics.commands_count
+    issued = commands_count[CommandStates.IssueCommand] + commands_count[CommandStates.IssueFactoryCommand]
+    assert len(lifecycles) == issued
+    for lifecycle in lifecycles:
+        assert lifecycle.issue_tick <= lifecycle.end_tick
+        assert lifecycle.end_reason in ("removed", "reissued", "replay_end")
+        if lifecycle.end_reason == "removed":
+            assert len(lifecycle.removed_units) == len(lifecycle.unit_ids)
+
+    live_ids = Counter(
+        (lifecycle.command_id for lifecycle in lifecycles if lifecycle.end_reason == "replay_end")
+    )
+    assert all(count == 1 for count in live_ids.values())
+
+
+def test_lifecycles_eviction(replay_data):
+    lifecycles = list(iter_lifecycles(replay_data, max_live=5))
+    assert sum(1 for lifecycle in lifecycles if lifecycle.end_reason == "replay_end") <= 5
+    assert len(lifecycles) == len(list(iter_lifecycles(replay_data)))
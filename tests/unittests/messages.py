@@ -0,0 +1,24 @@
+import pytest
+
+from replay_parser.constants import CommandStates
+from replay_parser.messages import chat_message, extract_messages, extract_messages_batch
+from replay_parser.replay import parse
+
+
+def test_extract_messages(replays, replay_data):
+    expected = parse(replay_data, parse_commands={CommandStates.Advance, CommandStates.LuaSimCallback})["messages"]
+
+    assert extract_messages(replays) == expected
+
+
+def test_extract_messages_batch(replay_data):
+    first, second = extract_messages_batch([replay_data, bytearray(replay_data)])
+    assert first == second == extract_messages(replay_data)
+
+
+def test_chat_message():
+    assert chat_message({"Sender": "player", "Msg": {"to": "all", "text": "gl hf"}}) == ("player", "all", "gl hf")
+    assert chat_message({"From": 1, "To": 2, "Mass": 100.0}) is None
+    for lua in (None, "Msg", {"Msg": {"to": "all", "text": ""}}, {"Sender": "player", "Msg": 1.0}):
+        with pytest.raises(ValueError):
+            chat_message(lua)
@@ -0,0 +1,31 @@
+from replay_parser.constants import CommandStates
+from replay_parser.metrics import ParserMetrics
+from replay_parser.replay import parse
+
+
+def test_metrics_counters(replay_data):
+    metrics = ParserMetrics(sample_rate=2)
+    data = parse(replay_data, metrics=metrics, parse_commands={CommandStates.Advance})
+    result = metrics.to_dict()
+
+    assert result["bytes_loaded"] == len(replay_data)
+    assert result["bytes_read"] == len(replay_data) - data["body_offset"]
+    assert result["commands_read"] == sum(row["count"] for row in result["commands"].values())
+
+    advance = result["commands"]["Advance"]
+    assert advance["parsed"] == advance["count"]
+    assert advance["timed"] == advance["parsed"] // 2
+    assert all(
+        not row["parsed"] for name, row in result["commands"].items() if name != "Advance"
+    )
+
+
+def test_metrics_callback(replay_data):
+    exported = []
+    metrics = ParserMetrics(sample_rate=0, callback=exported.append, callback_every=1000)
+    parse(replay_data, metrics=metrics)
+
+    assert exported
+    assert exported[-1] == metrics.to_dict()
+    assert len(exported) == metrics.commands_read // 1000 + 1
+    assert not any(row["timed"] for row in exported[-1]["commands"].values())
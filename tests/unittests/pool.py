@@ -0,0 +1,81 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from replay_parser.constants import CommandStates
+from replay_parser.metrics import ParserMetrics
+from replay_parser.pool import ParserPool, ReplayParser
+from replay_parser.replay import parse
+from replay_parser.storage import SpillingBodyStorage
+from tests.fixtures.replay_fixtures import get_replay_file_name, load_replay
+
+PARSE_COMMANDS = {CommandStates.Advance, CommandStates.SetCommandSource, CommandStates.VerifyChecksum}
+
+
+def test_parser_reuse(replay_data):
+    expected = parse(replay_data, parse_commands=PARSE_COMMANDS, store_body=True)
+    parser = ReplayParser(parse_commands=PARSE_COMMANDS, store_body=True)
+
+    first = parser.parse(replay_data)
+    second = parser.parse(bytearray(replay_data))
+    assert first == second == expected
+    assert first["body"] is not second["body"]
+
+
+def test_parser_reuse_body_storage(replay_data, tmpdir):
+    expected = parse(replay_data, parse_commands=PARSE_COMMANDS, store_body=True)["body"]
+    storage = SpillingBodyStorage(memory_ticks=10, directory=str(tmpdir))
+    parser = ReplayParser(parse_commands=PARSE_COMMANDS, body_storage=storage)
+
+    first = parser.parse(replay_data)["body"]
+    assert list(first) == expected
+    second = parser.parse(replay_data)["body"]
+    assert first is second is storage
+    assert list(second) == expected
+    storage.close()
+
+
+def test_parser_pool_threads():
+    replays = [load_replay(file_name) for file_name in get_replay_file_name()]
+    expected = [parse(data, parse_commands=PARSE_COMMANDS) for data in replays]
+
+    pool = ParserPool(size=2, parse_commands=PARSE_COMMANDS)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(pool.parse, replays * 2))
+
+    assert results == expected * 2
+    assert pool.parsers.qsize() <= 2
+
+
+def test_parser_pool_after_fork():
+    pool = ParserPool(size=1)
+    with pool.acquire() as parser:
+        pass
+    with pool.acquire() as same_parser:
+        assert same_parser is parser
+
+    pool.pid = -1  # simulates forked process
+    with pool.acquire() as new_parser:
+        assert new_parser is not parser
+
+
+def test_parser_pool_per_parser_options(replay_data):
+    with pytest.raises(ValueError):
+        ParserPool(metrics=ParserMetrics())
+    with pytest.raises(ValueError):
+        ParserPool(handlers={CommandStates.Advance: print})
+
+    created = []
+
+    def options_factory():
+        created.append(ParserMetrics(sample_rate=0))
+        return {"metrics": created[-1]}
+
+    pool = ParserPool(size=2, options_factory=options_factory, parse_commands=PARSE_COMMANDS)
+    with pool.acquire() as first, pool.acquire() as second:
+        assert first.reader.metrics is not second.reader.metrics
+        first.parse(replay_data)
+
+    assert len(created) == 2
+    assert created[0].to_dict()["bytes_loaded"] == len(replay_data)
+    assert created[1].to_dict()["bytes_loaded"] == 0
@@ -0,0 +1,35 @@
+from array import array
+
+from replay_parser.constants import CommandStates, TargetType
+from replay_parser.positions import CommandPositions, extract_positions
+from replay_parser.replay import parse
+
+
+def test_extract_positions(replay_data):
+    expected = []
+
+    def collect(tick, player_id, command):
+        cmd_data = command["cmd_data"]
+        if cmd_data["target"]["target"] == TargetType.Position:
+            expected.append((tick, player_id, cmd_data["command_type"], cmd_data["target"]["position"]))
+
+    parse(replay_data, handlers={CommandStates.IssueCommand: collect, CommandStates.IssueFactoryCommand: collect})
+    positions = extract_positions(replay_data, capacity=16)
+
+    assert len(positions) == len(expected)
+    assert positions.tick == array("I", [row[0] for row in expected])
+    assert positions.player_id == array("B", [row[1] for row in expected])
+    assert positions.action_type == array("B", [row[2] for row in expected])
+    assert positions.x == array("f", [row[3][0] for row in expected])
+    assert positions.z == array("f", [row[3][2] for row in expected])
+
+
+def test_positions_growth():
+    positions = CommandPositions(capacity=1)
+    for i in range(5):
+        positions.append(i, 1, 2, 1.5, 2.5, 3.5)
+
+    assert positions.capacity == 8
+    positions.trim()
+    assert list(positions.tick) == [0, 1, 2, 3, 4]
+    assert list(positions.y) == [2.5] * 5
@@ -0,0 +1,71 @@
+from io import RawIOBase
+
+import pytest
+
+from replay_parser.messages import extract_messages
+from replay_parser.metrics import ParserMetrics
+from replay_parser.reader import ReplayReader, StreamBuffer
+from replay_parser.replay import continuous_parse, parse, validate
+
+
+class PipeStream(RawIOBase):
+    """
+    Unseekable stream returning data in small irregular chunks like pipe
+    """
+
+    def __init__(self, data, chunk_sizes=(1, 7, 300, 4096)):
+        self.data = memoryview(data)
+        self.offset = 0
+        self.reads = 0
+        self.chunk_sizes = chunk_sizes
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self.chunk_sizes[self.reads % len(self.chunk_sizes)], len(self.data) - self.offset)
+        buffer[:size] = self.data[self.offset:self.offset + size]
+        self.offset += size
+        self.reads += 1
+        return size
+
+
+def test_parse_unseekable_stream(replay_data):
+    expected = parse(replay_data)
+    metrics = ParserMetrics(sample_rate=0)
+    result = parse(PipeStream(replay_data), metrics=metrics, stream_buffer_size=64)
+
+    for key in ("header", "body_offset", "messages", "desync_ticks", "last_tick"):
+        assert result[key] == expected[key]
+    assert metrics.to_dict()["bytes_loaded"] == len(replay_data)
+
+    streamed = list(continuous_parse(PipeStream(replay_data), parse_header=True, stream_buffer_size=1000))
+    assert streamed == list(continuous_parse(replay_data, parse_header=True))
+
+
+def test_stream_buffer_spans_refills():
+    data = b"first\x00" + b"x" * 100 + b"second\x00\x01\x00\x00\x00"
+    reader = ReplayReader(PipeStream(data), stream_buffer_size=4)
+    assert isinstance(reader.buffer, StreamBuffer)
+    assert reader.size() is None
+
+    assert reader.read_string() == "first"
+    reader.seek(100, 1)
+    assert reader.offset() == 106
+    assert reader.read_string() == "second"
+    assert len(reader.buffer.data) <= 7
+    assert reader.has_more(4)
+    assert not reader.has_more(5)
+    assert reader.read_uint() == 1
+    assert not reader.has_more()
+
+    with pytest.raises(ValueError):
+        reader.seek(0)
+    with pytest.raises(TypeError):
+        reader.get_data()
+
+
+def test_whole_replay_tools_reject_streams(replay_data):
+    for tool in (extract_messages, validate, lambda data: parse(data, recover=True)):
+        with pytest.raises(TypeError):
+            tool(PipeStream(replay_data))
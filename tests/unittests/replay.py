@@ -4,6 +4,7 @@ from constants import CommandStates
 from replay_parser.body import ReplayBody
 from replay_parser.reader import ReplayReader
 from replay_parser.replay import continuous_parse, parse
+from tests.fixtures.replay_fixtures import replay_summary
 
 
 def test_replay_parse(replays, replay_file_name):
@@ -80,3 +81,45 @@ def test_parse_until_desync(replays):
 def test_parse_only_ticks(replays):
     data = parse(replays, parse_commands=[CommandStates.Advance])
     assert data['last_tick']
+
+
+def test_replay_matches_golden_output(replay_data, golden_output):
+    assert replay_summary(replay_data) == golden_output
+
+
+def test_continuous_parse_tick_range(replay_data):
+    commands = list(continuous_parse(replay_data, parse_header=True))[1:]
+    last_tick = commands[-1][0]
+    start_tick, end_tick = last_tick // 3, last_tick // 2
+
+    ranged = list(continuous_parse(replay_data, parse_header=True, start_tick=start_tick, end_tick=end_tick))[1:]
+    assert ranged == [row for row in commands if row[0] <= end_tick]
+
+    issued = []
+    data = parse(
+        replay_data,
+        start_tick=start_tick,
+        end_tick=end_tick,
+        store_body=True,
+        handlers={CommandStates.IssueCommand: lambda tick, player_id, command: issued.append(tick)},
+    )
+    assert all(start_tick <= tick <= end_tick for tick in issued)
+    assert data["last_tick"] == ranged[-1][0] == max(row[0] for row in commands if row[0] <= end_tick)
+    assert len(data["body"]) <= end_tick - start_tick + 1
+
+
+def test_selections_are_shared(replay_data):
+    entity_ids_sets = []
+
+    def collect(tick, player_id, command):
+        entity_ids_sets.append(command["entity_ids_set"])
+
+    parse(replay_data, handlers={CommandStates.IssueCommand: collect, CommandStates.IssueFactoryCommand: collect})
+
+    selections = {}
+    for entity_ids_set in entity_ids_sets:
+        unit_ids = entity_ids_set["unit_ids"]
+        assert isinstance(unit_ids, tuple)
+        assert len(unit_ids) == entity_ids_set["units_number"]
+        assert selections.setdefault(unit_ids, unit_ids) is unit_ids
+        assert "selection_id" not in entity_ids_set
@@ -0,0 +1,27 @@
+from replay_parser.replay import parse
+from replay_parser.storage import SpillingBodyStorage
+
+
+def test_spilling_body_storage(replay_data, tmpdir):
+    expected = parse(replay_data, store_body=True)["body"]
+
+    storage = SpillingBodyStorage(memory_ticks=10, directory=str(tmpdir))
+    body = parse(replay_data, body_storage=storage)["body"]
+
+    assert body is storage
+    assert len(storage.window) <= 10
+    assert len(storage) == len(expected)
+    assert list(storage) == expected
+    assert list(storage) == expected
+
+    storage.close()
+    assert list(storage) == []
+
+
+def test_append_after_iteration(tmpdir):
+    storage = SpillingBodyStorage(memory_ticks=1, directory=str(tmpdir))
+    for tick in range(5):
+        storage.append({0: {"Advance": {"advance": tick}}})
+        next(iter(storage))
+
+    assert [tick_data[0]["Advance"]["advance"] for tick_data in storage] == [0, 1, 2, 3, 4]
@@ -0,0 +1,31 @@
+from replay_parser.constants import CommandStates
+from replay_parser.replay import parse
+from replay_parser.units import BlueprintRegistry, blueprints, units
+
+
+def test_blueprint_registry():
+    registry = BlueprintRegistry(max_unknown=2)
+    assert len(registry) == len(units)
+    assert registry.code("ual0001") == 0
+    assert registry.name(registry.code("uel0105")) == "T1 Engineer"
+    assert registry.blueprint_id(registry.code("uel0105")) == "uel0105"
+
+    assert registry.code("unknown01") is None
+    assert len(registry) == len(units)
+
+    first, second = "".join(("unknown", "01")), "".join(("unknown", "01"))
+    assert registry.intern(first) is registry.intern(second) is first
+    registry.intern("unknown02")
+    third = "".join(("unknown", "03"))
+    assert registry.intern(third) is third
+    assert registry.intern("".join(("unknown", "03"))) is not third
+    assert registry.intern("") == ""
+    assert len(registry.unknown) == 2
+
+
+def test_parsed_blueprint_ids_are_interned(replay_data):
+    issued = []
+    parse(replay_data, handlers={CommandStates.IssueCommand: lambda tick, player_id, command: issued.append(command)})
+    for command in issued:
+        blueprint_id = command["cmd_data"]["blueprint_id"]
+        assert blueprint_id is blueprints.intern(blueprint_id)
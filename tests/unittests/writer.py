@@ -0,0 +1,80 @@
+import struct
+from io import BytesIO
+
+import pytest
+
+from replay_parser.constants import CommandStates
+from replay_parser.economy import aggregate_economy
+from replay_parser.exception import InvalidReplay
+from replay_parser.replay import continuous_parse, parse
+from replay_parser.writer import trim_replay, write_filtered
+
+
+def test_write_without_filters(replay_data):
+    output = BytesIO()
+    assert write_filtered(replay_data, output) == 0
+    assert output.getvalue() == replay_data
+
+
+def test_write_without_messages(replay_data):
+    expected = parse(replay_data)
+
+    output = BytesIO()
+    dropped = write_filtered(replay_data, output, drop_messages=True, drop_commands={CommandStates.CreateProp})
+    data = parse(output.getvalue())
+
+    assert dropped >= len(expected["messages"])
+    assert data["messages"] == {}
+    assert data["header"] == expected["header"]
+    assert data["last_tick"] == expected["last_tick"]
+    assert data["desync_ticks"] == expected["desync_ticks"]
+
+    transfers = aggregate_economy(replay_data).transfers
+    filtered_transfers = aggregate_economy(output.getvalue()).transfers
+    assert {player_id: list(rows.mass) for player_id, rows in transfers.items()} == \
+        {player_id: list(rows.mass) for player_id, rows in filtered_transfers.items()}
+
+
+def test_write_without_callbacks(replay_data):
+    output = BytesIO()
+    write_filtered(replay_data, output, drop_callbacks=["GiveResourcesToPlayer", "CapMex"])
+    callbacks = aggregate_economy(output.getvalue()).callbacks
+    assert "GiveResourcesToPlayer" not in callbacks
+    assert "CapMex" not in callbacks
+
+
+@pytest.mark.parametrize("lua", [b"\x04\x01Msg\x00", b"\x04\x01Msg\x00\x00\x00\x00\x80\x3f\x05", b"\x02"])
+def test_write_without_malformed_messages(replay_data, lua):
+    body_offset = parse(replay_data, parse_body=False)["body_offset"]
+    payload = b"GiveResourcesToPlayer\x00" + lua
+    frame = struct.pack("<BH", CommandStates.LuaSimCallback, len(payload) + 3) + payload
+
+    with pytest.raises(InvalidReplay):
+        write_filtered(replay_data[:body_offset] + frame, BytesIO(), drop_messages=True)
+
+
+def test_required_commands_are_kept():
+    with pytest.raises(ValueError):
+        write_filtered(b"", BytesIO(), drop_commands={CommandStates.Advance})
+
+
+def test_trim_replay(replay_data):
+    header = parse(replay_data, parse_body=False)
+    commands = list(continuous_parse(replay_data, parse_header=True))[1:]
+    last_tick = commands[-1][0]
+    start_tick, end_tick = last_tick // 4, last_tick // 2
+
+    output = BytesIO()
+    assert trim_replay(replay_data, output, start_tick, end_tick) <= end_tick
+
+    trimmed = list(continuous_parse(output.getvalue(), parse_header=True))
+    assert trimmed[0] == header
+    assert [row for row in trimmed[1:] if row[0] >= start_tick] == \
+        [row for row in commands if start_tick <= row[0] <= end_tick]
+    assert parse(output.getvalue())["last_tick"] <= end_tick
+
+
+def test_trim_whole_replay(replay_data):
+    output = BytesIO()
+    trim_replay(replay_data, output)
+    assert output.getvalue() == replay_data